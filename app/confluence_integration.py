@@ -1,17 +1,12 @@
-from atlassian import Confluence
+from .core.clients import get_confluence
 from loguru import logger
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class ConfluenceIntegration:
     def __init__(self):
-        self.confluence = Confluence(
-            url=os.getenv('CONFLUENCE_URL'),
-            username=os.getenv('CONFLUENCE_USERNAME'),
-            password=os.getenv('CONFLUENCE_API_TOKEN')
-        )
+        self.confluence = get_confluence()
 
     def get_space_content(self, space_key: str):
         try:
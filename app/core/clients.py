@@ -0,0 +1,109 @@
+import random
+import threading
+from typing import Optional
+import httpx
+import requests
+from atlassian import Confluence, Jira
+from openai import AsyncOpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import get_settings
+from .logger import logger
+
+settings = get_settings()
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+class JitteredRetry(Retry):
+    """urllib3 retry policy with randomized exponential backoff.
+
+    A ``Retry-After`` header on 429/503 responses takes precedence over the
+    backoff, so rate limits are honored exactly.
+    """
+
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * (0.5 + random.random())
+
+_lock = threading.Lock()
+_openai_client: Optional[AsyncOpenAI] = None
+_jira: Optional[Jira] = None
+_confluence: Optional[Confluence] = None
+
+def get_openai_client() -> AsyncOpenAI:
+    global _openai_client
+    with _lock:
+        if _openai_client is None:
+            # The SDK retries 429/5xx with jittered backoff and honors Retry-After
+            _openai_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+                    ),
+                    timeout=settings.OPENAI_TIMEOUT
+                )
+            )
+            logger.info(f"Created async OpenAI client with {settings.OPENAI_MAX_CONNECTIONS} max connections")
+        return _openai_client
+
+def atlassian_session() -> requests.Session:
+    """A keep-alive session with a sized connection pool and retries on 429/5xx."""
+    retry = JitteredRetry(
+        total=settings.ATLASSIAN_MAX_RETRIES,
+        backoff_factor=settings.ATLASSIAN_BACKOFF_FACTOR,
+        status_forcelist=RETRYABLE_STATUS,
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.ATLASSIAN_POOL_SIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_jira() -> Jira:
+    global _jira
+    with _lock:
+        if _jira is None:
+            _jira = Jira(
+                url=settings.JIRA_URL,
+                username=settings.JIRA_USERNAME,
+                password=settings.JIRA_API_TOKEN,
+                timeout=settings.ATLASSIAN_TIMEOUT,
+                session=atlassian_session()
+            )
+        return _jira
+
+def get_confluence() -> Confluence:
+    global _confluence
+    with _lock:
+        if _confluence is None:
+            _confluence = Confluence(
+                url=settings.CONFLUENCE_URL,
+                username=settings.CONFLUENCE_USERNAME,
+                password=settings.CONFLUENCE_API_TOKEN,
+                timeout=settings.ATLASSIAN_TIMEOUT,
+                session=atlassian_session()
+            )
+        return _confluence
+
+async def close_clients():
+    """Close pooled connections; clients are recreated on next use."""
+    global _openai_client, _jira, _confluence
+    with _lock:
+        openai_client, jira, confluence = _openai_client, _jira, _confluence
+        _openai_client = _jira = _confluence = None
+    if openai_client is not None:
+        await openai_client.close()
+    for client in (jira, confluence):
+        if client is not None:
+            client.session.close()
+    logger.info("Closed API clients")
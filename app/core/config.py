@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -15,7 +16,70 @@ class Settings(BaseSettings):
     CONFLUENCE_API_TOKEN: str = os.getenv("CONFLUENCE_API_TOKEN")
     CHROMA_PERSIST_DIR: str = "chroma_db"
     MODEL_NAME: str = "gpt-3.5-turbo"
+    CHAT_CONTEXT_WINDOW: int = 16385
+    CHAT_MAX_RESPONSE_TOKENS: int = 1024
+    CHAT_CONTEXT_TOKENS: int = 3000
+    CHAT_SEARCH_RESULTS: int = 10
+    # With re-ranking enabled the cross-encoder filters precisely, so this can be lowered
+    CHAT_MIN_RELEVANCE_SCORE: float = 0.7
+    # An OpenAI model, or "local:<sentence-transformers model>" for in-process inference
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DEVICE: str = "cpu"
+    EMBEDDING_LOCAL_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: int = 10
+    # Lowered automatically when the embedding model accepts less (e.g. local models)
+    CHUNK_MAX_TOKENS: int = 300
+    CHUNK_OVERLAP_TOKENS: int = 50
+    CHUNK_STRATEGY: str = "markdown"
+    EMBEDDING_BATCH_SIZE: int = 256
+    EMBEDDING_BATCH_TOKENS: int = 100000
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_CACHE_PERSIST: bool = True
+    EMBEDDING_CACHE_DISK_SIZE: int = 100000
+    HYBRID_SEARCH: bool = True
+    SEARCH_RRF_K: int = 60
+    SEARCH_MAX_CANDIDATES: int = 200
+    SEARCH_FETCH_GROWTH: int = 4
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_TOP_N: int = 30
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_POOL_SIZE: int = 2
+    RERANK_BUDGET_MS: int = 500
+    RERANK_MIN_SCORE: Optional[float] = None
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_THRESHOLD: float = 0.97
+    RESPONSE_CACHE_TTL_SECONDS: int = 86400
+    RESPONSE_CACHE_SIZE: int = 1000
+    DELETE_BATCH_SIZE: int = 5000
+    # Matryoshka truncation of the vectors in the Chroma index (e.g. 384 for
+    # text-embedding-3-small); full vectors are then kept on disk for rescoring
+    INDEX_DIMENSIONS: Optional[int] = None
+    INDEX_RESCORE_FACTOR: int = 4
+    INDEX_RESCORE_DTYPE: str = "float16"
+    CHROMA_POOL_SIZE: int = 8
+    IO_POOL_SIZE: int = 16
+    PARSER_POOL_SIZE: int = max(1, (os.cpu_count() or 2) - 1)
+    PARSE_TIMEOUT_SECONDS: int = 120
+    PARSE_MEMORY_LIMIT_MB: int = 2048
+    UPLOAD_MAX_BYTES: int = 200 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_MAX_RETRIES: int = 3
+    ATLASSIAN_POOL_SIZE: int = 16
+    ATLASSIAN_TIMEOUT: int = 30
+    ATLASSIAN_MAX_RETRIES: int = 5
+    ATLASSIAN_BACKOFF_FACTOR: float = 0.5
+    JIRA_PAGE_SIZE: int = 100
+    # Delete detection lists keys only, so it can page much further per request
+    JIRA_KEY_PAGE_SIZE: int = 1000
+    JIRA_SYNC_OVERLAP_MINUTES: int = 5
+    JIRA_DETECT_DELETES: bool = True
+    CONFLUENCE_CONCURRENCY: int = 8
+    CONFLUENCE_PAGE_LIMIT: int = 50
+    CONFLUENCE_QUEUE_SIZE: int = 100
+    JOB_WORKERS: int = 2
 
 @lru_cache()
 def get_settings():
@@ -0,0 +1,206 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .execution import chroma_executor
+
+COLUMNS = ("id", "name", "source", "scope", "chunk_count", "size", "created_at", "updated_at")
+
+def jira_scope(project_key: str) -> str:
+    return f"jira:{project_key}"
+
+def confluence_scope(space_key: str) -> str:
+    return f"confluence:{space_key}"
+
+def document_name(doc_id: str, metadata: Dict[str, Any]) -> str:
+    """Display name of a document, from whichever metadata its source provides."""
+    return metadata.get("filename") or metadata.get("title") or metadata.get("key") or doc_id
+
+def document_scope(metadata: Dict[str, Any]) -> Optional[str]:
+    """The Jira project or Confluence space a document was synced from, if any."""
+    if metadata.get("project"):
+        return jira_scope(metadata["project"])
+    if metadata.get("space_key"):
+        return confluence_scope(metadata["space_key"])
+    return None
+
+def encode_cursor(created_at: float, doc_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, doc_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(doc_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+class DocumentCatalog:
+    """One row per stored document, so listing never touches chunk text.
+
+    Kept in SQLite next to the Chroma data and updated by the vector store
+    whenever documents are added or deleted. Listings are ordered newest
+    first and paginated with a keyset cursor on ``(created_at, id)``, so a
+    page costs the same however deep into the catalog it is. The chunk count
+    also tells the vector store a document's exact chunk ids for deletion.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # The catalog is derived from the collection, so a table from an older
+        # layout is dropped and backfilled again rather than migrated
+        existing = [row[1] for row in self._db.execute("PRAGMA table_info(documents)")]
+        if existing and tuple(existing) != COLUMNS:
+            self._db.execute("DROP TABLE documents")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, source TEXT NOT NULL, scope TEXT, "
+            "chunk_count INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_created ON documents (created_at, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_source ON documents (source, created_at, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_scope ON documents (scope)")
+        self._db.commit()
+
+    def _upsert(self, rows: List[Tuple[str, str, str, Optional[str], int, int]]):
+        now = time.time()
+        with self._lock:
+            # A re-ingested document keeps its place in the listing
+            self._db.executemany(
+                "INSERT INTO documents (id, name, source, scope, chunk_count, size, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name, source = excluded.source, scope = excluded.scope, "
+                "chunk_count = excluded.chunk_count, size = excluded.size, updated_at = excluded.updated_at",
+                [(*row, now, now) for row in rows]
+            )
+            self._db.commit()
+
+    def _delete(self, doc_ids: List[str]):
+        with self._lock:
+            for start in range(0, len(doc_ids), 500):
+                batch = doc_ids[start:start + 500]
+                self._db.execute(f"DELETE FROM documents WHERE id IN ({','.join('?' * len(batch))})", batch)
+            self._db.commit()
+
+    def _chunk_counts(
+        self,
+        doc_ids: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        scope: Optional[str] = None
+    ) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(doc_ids or []), 500):
+                batch = doc_ids[start:start + 500]
+                counts.update(self._db.execute(
+                    f"SELECT id, chunk_count FROM documents WHERE id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall())
+            if prefix:
+                # A range on the primary key, so the lookup uses its index
+                counts.update(self._db.execute(
+                    "SELECT id, chunk_count FROM documents WHERE id >= ? AND id < ?",
+                    (prefix, prefix + chr(0x10FFFF))
+                ).fetchall())
+            if scope:
+                counts.update(self._db.execute(
+                    "SELECT id, chunk_count FROM documents WHERE scope = ?", (scope,)
+                ).fetchall())
+        return counts
+
+    def _document_ids(self, scope: str, source: Optional[str] = None) -> List[str]:
+        query, params = "SELECT id FROM documents WHERE scope = ?", [scope]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        with self._lock:
+            return [doc_id for (doc_id,) in self._db.execute(query, params)]
+
+    def _get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(COLUMNS)} FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def _list(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        source: Optional[str] = None,
+        scope: Optional[str] = None,
+        name: Optional[str] = None,
+        updated_after: Optional[float] = None,
+        updated_before: Optional[float] = None
+    ) -> Dict[str, Any]:
+        clauses, params = [], []
+        if cursor:
+            created_at, doc_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, doc_id])
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if scope:
+            clauses.append("scope = ?")
+            params.append(scope)
+        if name:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if updated_after is not None:
+            clauses.append("updated_at >= ?")
+            params.append(updated_after)
+        if updated_before is not None:
+            clauses.append("updated_at <= ?")
+            params.append(updated_before)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+
+        # One extra row tells whether there is a next page
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM documents {where}"
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        documents = [dict(zip(COLUMNS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = documents[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return {"documents": documents, "next_cursor": next_cursor}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    async def upsert(self, rows: List[Tuple[str, str, str, Optional[str], int, int]]):
+        """Record ``(id, name, source, scope, chunk_count, size)`` rows for added or re-synced documents."""
+        if rows:
+            await chroma_executor.run(self._upsert, rows)
+
+    async def delete(self, doc_ids: Iterable[str]):
+        doc_ids = list(doc_ids)
+        if doc_ids:
+            await chroma_executor.run(self._delete, doc_ids)
+
+    async def chunk_counts(self, doc_ids: Optional[List[str]] = None, prefix: Optional[str] = None, scope: Optional[str] = None) -> Dict[str, int]:
+        """Chunk counts of the catalogued documents matching any of the given ids, id prefix or scope."""
+        return await chroma_executor.run(self._chunk_counts, doc_ids, prefix, scope)
+
+    async def document_ids(self, scope: str, source: Optional[str] = None) -> List[str]:
+        """Ids of the documents in a scope, optionally only those of one source type."""
+        return await chroma_executor.run(self._document_ids, scope, source)
+
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return await chroma_executor.run(self._get, doc_id)
+
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """A page of documents, newest first, and the cursor of the next page (``None`` on the last)."""
+        return await chroma_executor.run(self._list, limit, cursor, **filters)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
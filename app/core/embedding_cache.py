@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from .execution import chroma_executor
+from .logger import logger
+
+class EmbeddingCache:
+    """Content-hashed cache of query embeddings.
+
+    Entries are keyed by (model, normalized text) and kept in an in-memory LRU.
+    When ``db_path`` is set, a SQLite table acts as a second, larger tier that
+    survives restarts.
+    """
+
+    def __init__(self, model: str, max_entries: int = 2048, db_path: Optional[str] = None, max_disk_entries: int = 100000):
+        self.model = model
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._disk_writes = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{self.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: array):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, array]:
+        placeholders = ",".join("?" * len(keys))
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            if rows:
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(time.time(), key) for key, _ in rows]
+                )
+                self._db.commit()
+        found = {}
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            found[key] = vector
+        return found
+
+    def _disk_put(self, rows: List[tuple]):
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows
+            )
+            self._disk_writes += len(rows)
+            # Trim to the size limit periodically rather than on every write
+            if self._disk_writes >= 100:
+                self._disk_writes = 0
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+            self._db.commit()
+
+    async def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(text) for text in texts]
+        vectors: List[Optional[array]] = [None] * len(keys)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[i] = vector
+                    self.hits += 1
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing and self._db is not None:
+            found = await chroma_executor.run(self._disk_get, [keys[i] for i in missing])
+            for i in missing:
+                vector = found.get(keys[i])
+                if vector is not None:
+                    vectors[i] = vector
+                    self._remember(keys[i], vector)
+                    self.disk_hits += 1
+
+        self.misses += sum(1 for vector in vectors if vector is None)
+        return [vector.tolist() if vector is not None else None for vector in vectors]
+
+    async def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        rows = []
+        now = time.time()
+        for text, embedding in zip(texts, embeddings):
+            key = self.key(text)
+            vector = array("f", embedding)
+            self._remember(key, vector)
+            rows.append((key, vector.tobytes(), now))
+
+        if rows and self._db is not None:
+            try:
+                await chroma_executor.run(self._disk_put, rows)
+            except Exception as e:
+                # The disk tier is an optimization; never fail a search over it
+                logger.warning(f"Error writing embedding cache to disk: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
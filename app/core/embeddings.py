@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .clients import get_openai_client
+from .config import get_settings
+from .execution import BoundedExecutor, openai_limiter
+from .logger import logger
+
+settings = get_settings()
+
+class EmbeddingModelMismatchError(RuntimeError):
+    pass
+
+class EmbeddingBackend:
+    """Turns texts into embedding vectors; ``name`` identifies the model in stored collections."""
+
+    name: str
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def max_input_tokens(self) -> Optional[int]:
+        """Longest input, in the model's own tokens, that is embedded whole; ``None`` if unknown."""
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.name}
+
+    def close(self):
+        pass
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    def __init__(self, model: str):
+        self.model = model
+        self.name = f"openai:{model}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        async with openai_limiter:
+            response = await get_openai_client().embeddings.create(
+                model=self.model,
+                input=texts
+            )
+        return [item.embedding for item in response.data]
+
+    def max_input_tokens(self) -> Optional[int]:
+        return 8191
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """Runs a sentence-transformers model in-process, on CPU by default.
+
+    Requests that arrive within ``batch_window_ms`` of each other are merged
+    into one forward pass of up to ``max_batch_size`` texts, so many small
+    concurrent calls (e.g. search queries) share the cost of a batch. Passes
+    run one at a time on a dedicated thread; the model itself parallelizes
+    across cores. The model is loaded on first use.
+    """
+
+    def __init__(self, model: str, device: str = "cpu", max_batch_size: int = 64, batch_window_ms: int = 10):
+        self.model = model
+        self.name = f"local:{model}"
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._executor = BoundedExecutor("embedding", 1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+        self.batches = 0
+        self.texts = 0
+        self.truncated = 0
+
+    def _load(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:
+                    raise RuntimeError("Local embeddings need the sentence-transformers package")
+                started = time.perf_counter()
+                self._model = SentenceTransformer(self.model, device=self.device)
+                logger.info(f"Loaded embedding model {self.model} on {self.device} in {time.perf_counter() - started:.1f}s")
+            return self._model
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        model = self._load()
+        # The model silently drops tokens past max_seq_length, so count the texts it cuts
+        lengths = [len(ids) for ids in model.tokenizer(texts)["input_ids"]]
+        truncated = sum(1 for length in lengths if length > model.max_seq_length)
+        if truncated:
+            self.truncated += truncated
+            logger.warning(f"{truncated} of {len(texts)} texts exceed {self.model}'s {model.max_seq_length} tokens and were truncated")
+        return model.encode(
+            texts,
+            batch_size=self.max_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._batch_worker())
+        future = loop.create_future()
+        await self._queue.put((list(texts), future))
+        return await future
+
+    async def _batch_worker(self):
+        while True:
+            requests = [await self._queue.get()]
+            size = len(requests[0][0])
+            # Give concurrent callers a moment to join this pass
+            if size < self.max_batch_size:
+                await asyncio.sleep(self.batch_window)
+            while size < self.max_batch_size and not self._queue.empty():
+                request = self._queue.get_nowait()
+                requests.append(request)
+                size += len(request[0])
+
+            texts = [text for request_texts, _ in requests for text in request_texts]
+            try:
+                embeddings = await self._executor.run(self._encode, texts)
+            except Exception as e:
+                logger.error(f"Error computing local embeddings: {e}")
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in requests:
+                if not future.done():
+                    future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def max_input_tokens(self) -> Optional[int]:
+        return self._load().max_seq_length
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.name,
+            "device": self.device,
+            "loaded": self._model is not None,
+            "truncated_texts": self.truncated,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 1) if self.batches else 0.0,
+            "executor": self._executor.stats()
+        }
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown()
+
+BACKENDS: Dict[str, Callable[[str], EmbeddingBackend]] = {
+    "openai": OpenAIEmbeddingBackend,
+    "local": lambda model: LocalEmbeddingBackend(
+        model,
+        device=settings.EMBEDDING_DEVICE,
+        max_batch_size=settings.EMBEDDING_LOCAL_BATCH_SIZE,
+        batch_window_ms=settings.EMBEDDING_BATCH_WINDOW_MS
+    )
+}
+
+def register_backend(prefix: str, factory: Callable[[str], EmbeddingBackend]):
+    """Make ``<prefix>:<model>`` values of ``EMBEDDING_MODEL`` build backends with ``factory``."""
+    BACKENDS[prefix] = factory
+
+def get_embedding_backend(model: Optional[str] = None) -> EmbeddingBackend:
+    """Build the backend for a model setting such as ``local:all-MiniLM-L6-v2``; no prefix means OpenAI."""
+    model = model or settings.EMBEDDING_MODEL
+    prefix, _, name = model.partition(":")
+    if not name:
+        prefix, name = "openai", model
+    if prefix not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {prefix}")
+    return BACKENDS[prefix](name)
+
+def open_collection(client, name: str, model: str, dimensions: Optional[int] = None):
+    """Get or create a cosine collection that records the embedding model it holds.
+
+    ``dimensions`` is the length vectors are truncated to, if any. Raises
+    ``EmbeddingModelMismatchError`` if the collection was built with a
+    different model or truncation, since its vectors cannot be compared with
+    the new ones.
+    """
+    dimensions = dimensions or 0
+    try:
+        collection = client.get_collection(name=name, embedding_function=None)
+    except ValueError:
+        return client.create_collection(
+            name=name,
+            embedding_function=None,
+            metadata={"hnsw:space": "cosine", "embedding_model": model, "index_dimensions": dimensions}
+        )
+
+    recorded = (collection.metadata or {}).get("embedding_model")
+    recorded_dimensions = (collection.metadata or {}).get("index_dimensions", 0)
+    if recorded is None:
+        # Collections from before models were recorded hold the configured one
+        if collection.count():
+            logger.warning(f"Collection {name} has no recorded embedding model; assuming {model}")
+        # get_or_create replaces the metadata without re-checking the distance function
+        collection = client.get_or_create_collection(
+            name=name,
+            embedding_function=None,
+            metadata={**(collection.metadata or {}), "embedding_model": model, "index_dimensions": recorded_dimensions}
+        )
+        recorded = model
+    if recorded != model:
+        raise EmbeddingModelMismatchError(
+            f"Collection {name} was embedded with {recorded}, not {model}; "
+            f"re-index it or set EMBEDDING_MODEL back to {recorded}"
+        )
+    if recorded_dimensions != dimensions:
+        raise EmbeddingModelMismatchError(
+            f"Collection {name} holds vectors truncated to {recorded_dimensions or 'full'} dimensions, "
+            f"not {dimensions or 'full'}; re-index it or set INDEX_DIMENSIONS back"
+        )
+    return collection
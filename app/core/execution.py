@@ -0,0 +1,281 @@
+import asyncio
+import functools
+import multiprocessing
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from .config import get_settings
+from .logger import logger
+
+settings = get_settings()
+
+class PoolMetrics:
+    """Tracks queue depth, in-flight work and wait times for a pool."""
+
+    def __init__(self, name: str, capacity: int, window: int = 1024):
+        self.name = name
+        self.capacity = capacity
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.max_wait = 0.0
+        self._waits = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def enqueue(self) -> float:
+        with self._lock:
+            self.queued += 1
+        return time.perf_counter()
+
+    def dequeue(self):
+        # The caller gave up before the work started
+        with self._lock:
+            self.queued -= 1
+            self.cancelled += 1
+
+    def start(self, enqueued_at: float):
+        wait = time.perf_counter() - enqueued_at
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+
+    def finish(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "name": self.name,
+                "capacity": self.capacity,
+                "queue_depth": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "cancelled": self.cancelled
+            }
+        if waits:
+            stats.update({
+                "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 2),
+                "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 2),
+                "wait_ms_p99": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 2),
+                "wait_ms_max": round(self.max_wait * 1000, 2)
+            })
+        return stats
+
+class BoundedExecutor:
+    """Runs blocking callables on a fixed-size thread pool without blocking the event loop."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.metrics = PoolMetrics(name, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        enqueued_at = self.metrics.enqueue()
+        # Taken by whichever comes first, the task starting or the caller
+        # being cancelled, so the queued count is settled exactly once
+        claimed = threading.Lock()
+
+        def task():
+            if not claimed.acquire(blocking=False):
+                return None
+            self.metrics.start(enqueued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.metrics.finish()
+
+        try:
+            return await loop.run_in_executor(self._pool, task)
+        except asyncio.CancelledError:
+            if claimed.acquire(blocking=False):
+                self.metrics.dequeue()
+            raise
+
+    def idle_workers(self) -> int:
+        """Workers free to start a call now, i.e. capacity not taken by running or queued calls."""
+        return max(0, self.metrics.capacity - self.metrics.active - self.metrics.queued)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.metrics.snapshot()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+class ConcurrencyLimiter:
+    """Caps concurrent async calls (e.g. to OpenAI) and records how long callers wait."""
+
+    def __init__(self, name: str, limit: int):
+        self.metrics = PoolMetrics(name, limit)
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        enqueued_at = self.metrics.enqueue()
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            # Cancelled while waiting; undo the queued count
+            self.metrics.dequeue()
+            raise
+        self.metrics.start(enqueued_at)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        self.metrics.finish()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.metrics.snapshot()
+
+def _limit_worker_memory(limit_bytes: int):
+    # Runs once in each parser process; allocations beyond the cap raise MemoryError
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not set parser memory limit: {e}")
+
+class TaskTimeoutError(Exception):
+    """Raised when a process pool task exceeds its time limit."""
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeoutError("Task exceeded the time limit")
+
+def _run_with_timeout(timeout: int, fn: Callable, *args, **kwargs) -> Any:
+    # Runs in the worker's main thread, so SIGALRM can interrupt the parser
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.alarm(timeout)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        signal.alarm(0)
+
+class ProcessPool:
+    """Runs CPU-bound work (document parsing) in worker processes.
+
+    Each task is limited to ``timeout`` seconds inside the worker, and each
+    worker's address space is capped at ``memory_limit_mb``. If a worker hangs
+    past the timeout or dies, the pool is replaced. Replacing it fails the
+    other tasks in flight too, so each of those is retried once in a worker
+    of its own, where it cannot be taken down by another task again.
+    """
+
+    def __init__(self, name: str, max_workers: int, timeout: int, memory_limit_mb: int):
+        self.metrics = PoolMetrics(name, max_workers)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.retries = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Only hand the pool as many tasks as it has workers, so queueing is
+        # visible in the metrics and does not count against the timeout
+        self._slots = asyncio.Semaphore(max_workers)
+
+    def _new_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_limit_worker_memory,
+            initargs=(self.memory_limit_mb * 1024 * 1024,)
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = self._new_pool(self.max_workers)
+        return self._pool
+
+    @staticmethod
+    def _terminate(pool: ProcessPoolExecutor):
+        # Workers stuck in C code ignore SIGALRM, so terminate them outright;
+        # tasks still running in them fail with BrokenProcessPool
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+    def _reset(self, pool: ProcessPoolExecutor):
+        # Another task may already have replaced this pool
+        if self._pool is pool:
+            self._pool = None
+        self._terminate(pool)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        enqueued_at = self.metrics.enqueue()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self.metrics.dequeue()
+            raise
+        self.metrics.start(enqueued_at)
+        try:
+            return await self._submit(loop, fn, *args, **kwargs)
+        finally:
+            self._slots.release()
+            self.metrics.finish()
+
+    async def _run_in(self, loop: asyncio.AbstractEventLoop, pool: ProcessPoolExecutor, fn: Callable, *args, **kwargs) -> Any:
+        future = loop.run_in_executor(pool, functools.partial(_run_with_timeout, self.timeout, fn, *args, **kwargs))
+        # Grace period on top of the in-worker alarm before giving up on the worker
+        return await asyncio.wait_for(future, timeout=self.timeout + 10)
+
+    async def _submit(self, loop: asyncio.AbstractEventLoop, fn: Callable, *args, **kwargs) -> Any:
+        pool = self._get_pool()
+        try:
+            return await self._run_in(loop, pool, fn, *args, **kwargs)
+        except asyncio.TimeoutError:
+            logger.error(f"{self.metrics.name} task did not finish in {self.timeout}s; restarting pool")
+            self._reset(pool)
+            raise TaskTimeoutError("Task exceeded the time limit")
+        except BrokenProcessPool:
+            # Either this task's worker died or the pool was torn down under it
+            # for another task; which one is unknown, so retry it alone
+            logger.warning(f"{self.metrics.name} worker pool broke; retrying task in its own worker")
+            self._reset(pool)
+            return await self._retry(loop, fn, *args, **kwargs)
+
+    async def _retry(self, loop: asyncio.AbstractEventLoop, fn: Callable, *args, **kwargs) -> Any:
+        self.retries += 1
+        pool = self._new_pool(1)
+        try:
+            return await self._run_in(loop, pool, fn, *args, **kwargs)
+        except asyncio.TimeoutError:
+            logger.error(f"{self.metrics.name} task did not finish in {self.timeout}s on retry")
+            raise TaskTimeoutError("Task exceeded the time limit")
+        finally:
+            self._terminate(pool)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics.snapshot(), "retries": self.retries}
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            # Queued tasks are dropped; their jobs resume after a restart
+            pool.shutdown(wait=True, cancel_futures=True)
+
+chroma_executor = BoundedExecutor("chroma", settings.CHROMA_POOL_SIZE)
+io_executor = BoundedExecutor("io", settings.IO_POOL_SIZE)
+openai_limiter = ConcurrencyLimiter("openai", settings.OPENAI_MAX_CONNECTIONS)
+parser_pool = ProcessPool(
+    "parser",
+    settings.PARSER_POOL_SIZE,
+    timeout=settings.PARSE_TIMEOUT_SECONDS,
+    memory_limit_mb=settings.PARSE_MEMORY_LIMIT_MB
+)
+
+def execution_stats() -> Dict[str, Any]:
+    return {
+        "chroma": chroma_executor.stats(),
+        "io": io_executor.stats(),
+        "parser": parser_pool.stats(),
+        "openai": openai_limiter.stats()
+    }
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from .config import get_settings
+from .logger import logger
+
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class JobStore:
+    """SQLite-backed job table holding status, progress and resume checkpoints.
+
+    The database is opened on first use.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "id TEXT PRIMARY KEY, kind TEXT NOT NULL, key TEXT, params TEXT NOT NULL, "
+                    "status TEXT NOT NULL, progress TEXT, checkpoint TEXT, result TEXT, error TEXT, "
+                    "attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+                    "started_at REAL, updated_at REAL NOT NULL, finished_at REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+                conn.commit()
+                self._conn = conn
+            return self._conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for field in ("params", "progress", "checkpoint", "result"):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def create(self, kind: str, params: Dict[str, Any], key: Optional[str] = None) -> Dict[str, Any]:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, key, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, key, json.dumps(params), QUEUED, now, now)
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def find_active(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (kind, key, QUEUED, RUNNING)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM jobs"
+        params: list = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def incomplete(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, job_id: str, **fields):
+        for field in ("progress", "checkpoint", "result"):
+            if field in fields:
+                fields[field] = json.dumps(fields[field])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+class JobContext:
+    """Handed to job handlers to report progress and persist resume checkpoints."""
+
+    def __init__(self, store: JobStore, job: Dict[str, Any]):
+        self.store = store
+        self.job_id = job["id"]
+        self.params = job["params"]
+        self.checkpoint: Dict[str, Any] = job["checkpoint"] or {}
+        self.progress: Dict[str, Any] = job["progress"] or {}
+
+    def update_progress(self, progress: Dict[str, Any]):
+        self.progress = {**self.progress, **progress}
+        self.store.update(self.job_id, progress=self.progress)
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]):
+        self.checkpoint = checkpoint
+        self.store.update(self.job_id, checkpoint=checkpoint)
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+class JobManager:
+    """Runs registered job kinds on a fixed number of async workers.
+
+    Jobs left queued or running by a previous process are re-queued on start
+    and resume from their last checkpoint.
+    """
+
+    def __init__(self, store: JobStore, workers: int):
+        self.store = store
+        self.workers = workers
+        self.handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        for job in self.store.incomplete():
+            logger.info(f"Resuming {job['kind']} job {job['id']}")
+            self._queue.put_nowait(job["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, params: Dict[str, Any], key: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a job; if ``key`` matches an active job of the same kind, return that job instead."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if key is not None:
+            active = self.store.find_active(kind, key)
+            if active is not None:
+                return active
+        self.start()
+        job = self.store.create(kind, params, key=key)
+        self._queue.put_nowait(job["id"])
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if job["started_at"] and job["progress"]:
+            elapsed = (job["finished_at"] or time.time()) - job["started_at"]
+            job["elapsed_seconds"] = round(elapsed, 3)
+            if elapsed > 0 and job["progress"].get("chunks_embedded") is not None:
+                job["chunks_per_second"] = round(job["progress"]["chunks_embedded"] / elapsed, 2)
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in (QUEUED, RUNNING):
+                continue
+
+            handler = self.handlers.get(job["kind"])
+            if handler is None:
+                self.store.update(job_id, status=FAILED, error=f"Unknown job kind: {job['kind']}", finished_at=time.time())
+                continue
+
+            self.store.update(
+                job_id,
+                status=RUNNING,
+                attempts=job["attempts"] + 1,
+                started_at=job["started_at"] or time.time()
+            )
+            try:
+                result = await handler(JobContext(self.store, job))
+                self.store.update(job_id, status=COMPLETED, result=result, finished_at=time.time())
+                logger.info(f"Job {job_id} ({job['kind']}) completed")
+            except asyncio.CancelledError:
+                # Shutting down; leave the job running so it resumes on restart
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+                self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+
+job_manager = JobManager(
+    JobStore(os.path.join(settings.CHROMA_PERSIST_DIR, "jobs.sqlite3")),
+    workers=settings.JOB_WORKERS
+)
@@ -0,0 +1,117 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Set, Tuple
+from .execution import chroma_executor
+
+TERM_PATTERN = re.compile(r"[\w-]+")
+# Identifiers such as Jira keys (ABC-1234) and error codes (ERR_42, 0x80070005)
+IDENTIFIER_PATTERN = re.compile(r"^(?=.*\d)(?=.*[A-Za-z_-])[\w.-]+$|^\d{3,}$")
+
+def is_identifier_query(query: str) -> bool:
+    """True for short queries made only of identifiers, which embeddings handle poorly."""
+    terms = query.split()
+    return 0 < len(terms) <= 3 and all(IDENTIFIER_PATTERN.match(term) for term in terms)
+
+def query_identifiers(query: str) -> Set[str]:
+    """Lower-cased identifier terms of a query, e.g. ``abc-1234`` in "status of ABC-1234"."""
+    return {term for term in TERM_PATTERN.findall(query.lower()) if IDENTIFIER_PATTERN.match(term)}
+
+def contains_identifier(text: str, identifiers: Set[str]) -> bool:
+    return bool(identifiers) and not identifiers.isdisjoint(TERM_PATTERN.findall(text.lower()))
+
+def match_expression(query: str) -> str:
+    # Quote every term so FTS5 query syntax in user input is taken literally
+    terms = [term for term in TERM_PATTERN.findall(query.lower()) if any(c.isalnum() for c in term)]
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in dict.fromkeys(terms))
+
+class LexicalIndex:
+    """BM25 index over chunk text, kept next to the Chroma collection.
+
+    Backed by an SQLite FTS5 table, which stores compressed postings on disk
+    and updates them incrementally as chunks are upserted and deleted. Hyphens
+    and underscores are token characters, so ``ABC-1234`` is indexed whole.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "rowid INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, parent_id TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_parent ON chunks (parent_id)")
+        # detail=column keeps per-column term counts for BM25 but no positions
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_text USING fts5("
+            "text, tokenize = \"unicode61 tokenchars '-_'\", detail = column)"
+        )
+        self._db.commit()
+
+    def _upsert(self, rows: List[Tuple[str, str, str]]):
+        with self._lock:
+            for chunk_id, parent_id, text in rows:
+                rowid = self._db.execute(
+                    "INSERT INTO chunks (chunk_id, parent_id) VALUES (?, ?) "
+                    "ON CONFLICT (chunk_id) DO UPDATE SET parent_id = excluded.parent_id RETURNING rowid",
+                    (chunk_id, parent_id)
+                ).fetchone()[0]
+                self._db.execute("DELETE FROM chunk_text WHERE rowid = ?", (rowid,))
+                self._db.execute("INSERT INTO chunk_text (rowid, text) VALUES (?, ?)", (rowid, text))
+            self._db.commit()
+
+    def _delete_rowids(self, rowids: List[int]):
+        for start in range(0, len(rowids), 500):
+            batch = rowids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            self._db.execute(f"DELETE FROM chunk_text WHERE rowid IN ({placeholders})", batch)
+            self._db.execute(f"DELETE FROM chunks WHERE rowid IN ({placeholders})", batch)
+
+    def _delete_ids(self, chunk_ids: List[str]):
+        with self._lock:
+            rowids = []
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rowids.extend(row[0] for row in self._db.execute(
+                    f"SELECT rowid FROM chunks WHERE chunk_id IN ({placeholders})", batch
+                ))
+            self._delete_rowids(rowids)
+            self._db.commit()
+
+    def _search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        expression = match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT chunks.chunk_id, chunks.parent_id, bm25(chunk_text) AS score "
+                "FROM chunk_text JOIN chunks ON chunks.rowid = chunk_text.rowid "
+                "WHERE chunk_text MATCH ? ORDER BY score LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+        # FTS5 reports BM25 as a negative number, lower being better
+        return [{"id": chunk_id, "parent_id": parent_id, "score": -score} for chunk_id, parent_id, score in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    async def upsert(self, rows: List[Tuple[str, str, str]]):
+        """Index ``(chunk_id, parent_id, text)`` rows, replacing earlier text of the same chunks."""
+        if rows:
+            await chroma_executor.run(self._upsert, rows)
+
+    async def delete_ids(self, chunk_ids: List[str]):
+        if chunk_ids:
+            await chroma_executor.run(self._delete_ids, chunk_ids)
+
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return await chroma_executor.run(self._search, query, limit)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
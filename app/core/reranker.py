@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .execution import BoundedExecutor
+from .logger import logger
+
+class Reranker:
+    """Re-scores search candidates with a cross-encoder on CPU.
+
+    The cross-encoder reads the query and each candidate together, which
+    ranks far more precisely than comparing embeddings but costs a forward
+    pass per pair. Pairs are scored in batches on a small thread pool, and a
+    call that does not finish within its latency budget returns ``None`` so
+    the caller keeps its original order; the pass still completes in the
+    background. While every worker is busy (e.g. with passes that ran over
+    budget), calls are skipped rather than queued behind them. The model is
+    loaded on first use.
+    """
+
+    def __init__(self, model: str, batch_size: int = 32, pool_size: int = 2):
+        self.model = model
+        self.batch_size = batch_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._executor = BoundedExecutor("rerank", pool_size)
+        self.calls = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def _load(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import CrossEncoder
+                except ImportError:
+                    raise RuntimeError("Re-ranking needs the sentence-transformers package")
+                started = time.perf_counter()
+                self._model = CrossEncoder(self.model, device="cpu")
+                logger.info(f"Loaded re-ranking model {self.model} in {time.perf_counter() - started:.1f}s")
+            return self._model
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        scores = self._load().predict(
+            [(query, text) for text in texts],
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+    def load(self):
+        """Load the model now, e.g. at startup, so the first search stays within budget."""
+        self._load()
+
+    async def score(self, query: str, texts: List[str], budget_ms: Optional[int] = None) -> Tuple[Optional[List[float]], float]:
+        """Score ``(query, text)`` pairs; returns the scores, or ``None`` past the budget, when busy or on error, and the time taken in ms."""
+        started = time.perf_counter()
+        self.calls += 1
+        if not self._executor.idle_workers():
+            self.skipped += 1
+            logger.warning(f"No re-ranking worker free for {len(texts)} candidates; keeping retrieval order")
+            return None, 0.0
+        try:
+            scores = await asyncio.wait_for(
+                self._executor.run(self._score, query, texts),
+                timeout=budget_ms / 1000 if budget_ms else None
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"Re-ranking {len(texts)} candidates exceeded {budget_ms}ms; keeping retrieval order")
+            scores = None
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error re-ranking candidates: {e}")
+            scores = None
+        return scores, (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "loaded": self._model is not None,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "executor": self._executor.stats()
+        }
+
+    def close(self):
+        self._executor.shutdown()
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+from .embeddings import EmbeddingModelMismatchError, open_collection
+from .execution import chroma_executor
+from .logger import logger
+
+class ResponseCache:
+    """Semantic cache of chat answers, keyed by the question's embedding.
+
+    Entries live in a dedicated Chroma collection. A lookup hits when a past
+    question in the same scope is similar enough, the entry is younger than
+    ``ttl_seconds``, and every source document it was answered from is still
+    at the version it had then. Document versions are kept in a small SQLite
+    table and bumped whenever the vector store changes or deletes a document,
+    which invalidates every answer built on it. Past ``max_entries``, the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, client, model: str, db_path: str, threshold: float = 0.97, ttl_seconds: int = 86400, max_entries: int = 1000):
+        try:
+            self.collection = open_collection(client, "response_cache", model)
+        except EmbeddingModelMismatchError:
+            # Cached answers are disposable; start over under the new model
+            logger.info(f"Embedding model changed to {model}; clearing the response cache")
+            client.delete_collection("response_cache")
+            self.collection = open_collection(client, "response_cache", model)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS document_versions ("
+            "parent_id TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        self._db.commit()
+
+    def _versions(self, parent_ids: List[str]) -> Dict[str, int]:
+        if not parent_ids:
+            return {}
+        placeholders = ",".join("?" * len(parent_ids))
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT parent_id, version FROM document_versions WHERE parent_id IN ({placeholders})",
+                parent_ids
+            ).fetchall()
+        versions = dict(rows)
+        return {parent_id: versions.get(parent_id, 0) for parent_id in parent_ids}
+
+    def _bump_versions(self, parent_ids: List[str]):
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT INTO document_versions (parent_id, version) VALUES (?, 1) "
+                "ON CONFLICT (parent_id) DO UPDATE SET version = version + 1",
+                [(parent_id,) for parent_id in parent_ids]
+            )
+            self._db.commit()
+
+    def _lookup(self, embedding: List[float], scope: str) -> Optional[Dict[str, Any]]:
+        if self.collection.count() == 0:
+            return None
+        results = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=1,
+            where={"scope": scope},
+            include=["metadatas", "distances"]
+        )
+        if not results["ids"][0]:
+            return None
+
+        entry_id = results["ids"][0][0]
+        metadata = results["metadatas"][0][0]
+        similarity = 1 - (results["distances"][0][0] / 2)  # Assuming cosine distance
+        if similarity < self.threshold:
+            return None
+
+        now = time.time()
+        sources = json.loads(metadata["sources"])
+        if now - metadata["created_at"] > self.ttl_seconds or self._versions(list(sources)) != sources:
+            self.collection.delete(ids=[entry_id])
+            return None
+
+        self.collection.update(ids=[entry_id], metadatas=[{**metadata, "last_used": now}])
+        return {
+            "response": metadata["response"],
+            "context": json.loads(metadata["context"]),
+            "similarity_score": similarity
+        }
+
+    def _store(self, embedding: List[float], question: str, scope: str, response: str, context: List[dict], sources: Dict[str, int]):
+        now = time.time()
+        self.collection.add(
+            ids=[str(uuid.uuid4())],
+            embeddings=[embedding],
+            documents=[question],
+            metadatas=[{
+                "scope": scope,
+                "response": response,
+                "context": json.dumps(context),
+                "sources": json.dumps(sources),
+                "created_at": now,
+                "last_used": now
+            }]
+        )
+        # Evict periodically rather than on every write
+        self._stores += 1
+        if self._stores % 50 == 0 or self.collection.count() > self.max_entries * 1.1:
+            self._evict()
+
+    def _evict(self):
+        self.collection.delete(where={"created_at": {"$lt": time.time() - self.ttl_seconds}})
+        count = self.collection.count()
+        if count <= self.max_entries:
+            return
+        entries = self.collection.get(include=["metadatas"])
+        by_age = sorted(zip(entries["ids"], entries["metadatas"]), key=lambda entry: entry[1]["last_used"])
+        self.collection.delete(ids=[entry_id for entry_id, _ in by_age[:count - self.max_entries]])
+
+    async def lookup(self, embedding: List[float], scope: str) -> Optional[Dict[str, Any]]:
+        try:
+            cached = await chroma_executor.run(self._lookup, embedding, scope)
+        except Exception as e:
+            # The cache is an optimization; never fail a chat request over it
+            logger.warning(f"Error reading response cache: {e}")
+            cached = None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    async def snapshot(self, parent_ids: List[str]) -> Dict[str, int]:
+        """Current versions of the documents an answer is about to be built from.
+
+        Take it right after retrieval: a document changed later then no longer
+        matches the cached entry.
+        """
+        return await chroma_executor.run(self._versions, list(dict.fromkeys(parent_ids)))
+
+    async def store(self, embedding: List[float], question: str, scope: str, response: str, context: List[dict], sources: Dict[str, int]):
+        """Cache an answer; ``sources`` is the ``snapshot`` of its context documents."""
+        try:
+            await chroma_executor.run(self._store, embedding, question, scope, response, context, sources)
+        except Exception as e:
+            logger.warning(f"Error writing response cache: {e}")
+
+    async def invalidate(self, parent_ids: Iterable[str]):
+        """Mark documents as changed, so cached answers built on them stop matching."""
+        if parent_ids:
+            await chroma_executor.run(self._bump_versions, list(parent_ids))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.collection.count(),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
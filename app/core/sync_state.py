@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from .config import get_settings
+
+settings = get_settings()
+
+class SyncStateStore:
+    """Per-source sync high-water marks, persisted in SQLite next to the Chroma data.
+
+    The database is opened on first use.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sync_state ("
+                    "source TEXT NOT NULL, scope TEXT NOT NULL, watermark TEXT, "
+                    "last_run_at REAL, stats TEXT, PRIMARY KEY (source, scope))"
+                )
+                conn.commit()
+                self._conn = conn
+            return self._conn
+
+    def get(self, source: str, scope: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark, last_run_at, stats FROM sync_state WHERE source = ? AND scope = ?",
+                (source, scope)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "watermark": row[0],
+            "last_run_at": row[1],
+            "stats": json.loads(row[2]) if row[2] else None
+        }
+
+    def set(self, source: str, scope: str, watermark: Optional[str], stats: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (source, scope, watermark, last_run_at, stats) VALUES (?, ?, ?, ?, ?)",
+                (source, scope, watermark, time.time(), json.dumps(stats) if stats is not None else None)
+            )
+            self._db.commit()
+
+    def clear(self, source: str, scope: str):
+        with self._lock:
+            self._db.execute("DELETE FROM sync_state WHERE source = ? AND scope = ?", (source, scope))
+            self._db.commit()
+
+sync_state = SyncStateStore(os.path.join(settings.CHROMA_PERSIST_DIR, "sync_state.sqlite3"))
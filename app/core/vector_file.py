@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+class VectorFile:
+    """Full-precision embeddings in a memory-mapped file, looked up by chunk id.
+
+    Vectors are stored normalized, one per row of a flat matrix in
+    ``<path>.<dtype>`` that grows in place as needed. An SQLite table maps
+    chunk ids to rows and keeps the rows of deleted chunks for reuse. Only the
+    rows a query reads are paged in, so these vectors cost disk, not RAM.
+    """
+
+    def __init__(self, path: str, dtype: str = "float16"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.dtype = np.dtype(dtype)
+        self._data_path = f"{path}.{self.dtype.name}"
+        self._db = sqlite3.connect(f"{path}.{self.dtype.name}.sqlite3", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS vector_rows (chunk_id TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS free_rows (row INTEGER PRIMARY KEY)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.commit()
+
+        meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        self.dim = meta.get("dim")
+        self._next_row = meta.get("next_row", 0)
+        self._matrix = None
+        if self.dim and os.path.exists(self._data_path):
+            self._map(os.path.getsize(self._data_path) // (self.dim * self.dtype.itemsize))
+
+    def _map(self, capacity: int):
+        self._matrix = np.memmap(self._data_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = len(self._matrix) if self._matrix is not None else 0
+        if rows <= capacity:
+            return
+        # Grow geometrically so appends stay amortized O(1)
+        capacity = max(rows, capacity * 2, 1024)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._data_path, "ab") as f:
+            f.truncate(capacity * self.dim * self.dtype.itemsize)
+        self._map(capacity)
+
+    def _rows(self, chunk_ids: List[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        for start in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[start:start + 500]
+            rows.update(self._db.execute(
+                f"SELECT chunk_id, row FROM vector_rows WHERE chunk_id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall())
+        return rows
+
+    def put(self, chunk_ids: List[str], vectors: List[List[float]]):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                self._db.execute("INSERT INTO meta (key, value) VALUES ('dim', ?)", (self.dim,))
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {matrix.shape[1]}")
+
+            rows = self._rows(chunk_ids)
+            new_ids = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id not in rows]
+            free = [row for (row,) in self._db.execute("SELECT row FROM free_rows LIMIT ?", (len(new_ids),))]
+            self._db.executemany("DELETE FROM free_rows WHERE row = ?", [(row,) for row in free])
+            for chunk_id in new_ids:
+                if free:
+                    rows[chunk_id] = free.pop()
+                else:
+                    rows[chunk_id] = self._next_row
+                    self._next_row += 1
+            self._ensure_capacity(self._next_row)
+
+            self._matrix[[rows[chunk_id] for chunk_id in chunk_ids]] = matrix.astype(self.dtype)
+            self._matrix.flush()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO vector_rows (chunk_id, row) VALUES (?, ?)",
+                [(chunk_id, rows[chunk_id]) for chunk_id in new_ids]
+            )
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_row', ?)", (self._next_row,))
+            self._db.commit()
+
+    def get(self, chunk_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the normalized vectors of ``chunk_ids`` as float32 rows, and a mask of those found."""
+        with self._lock:
+            rows = self._rows(chunk_ids)
+            found = np.array([chunk_id in rows for chunk_id in chunk_ids], dtype=bool)
+            vectors = np.zeros((len(chunk_ids), self.dim or 0), dtype=np.float32)
+            if found.any():
+                vectors[found] = self._matrix[[rows[chunk_id] for chunk_id in chunk_ids if chunk_id in rows]]
+        return vectors, found
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [chunk_id for (chunk_id,) in self._db.execute("SELECT chunk_id FROM vector_rows ORDER BY row")]
+
+    def delete(self, chunk_ids: List[str]):
+        with self._lock:
+            rows = self._rows(chunk_ids)
+            if not rows:
+                return
+            self._db.executemany("DELETE FROM vector_rows WHERE chunk_id = ?", [(chunk_id,) for chunk_id in rows])
+            self._db.executemany("INSERT OR IGNORE INTO free_rows (row) VALUES (?)", [(row,) for row in rows.values()])
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM vector_rows").fetchone()[0]
+        return {
+            "vectors": count,
+            "dimensions": self.dim,
+            "dtype": self.dtype.name,
+            "file_bytes": os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+                self._matrix = None
+            self._db.close()
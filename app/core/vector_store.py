@@ -1,122 +1,929 @@
-<content>import chromadb
+import chromadb
 from chromadb.config import Settings
-from chromadb.utils import embedding_functions
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
+import hashlib
+import math
+import os
+import threading
+import time
+import numpy as np
+from datetime import datetime, timezone
+from ..models import SearchFilters
 from ..utils.text_chunker import TextChunker
 from .config import get_settings
+from .document_catalog import DocumentCatalog, document_name, document_scope
+from .embeddings import EmbeddingBackend, get_embedding_backend, open_collection
+from .embedding_cache import EmbeddingCache
+from .lexical_index import LexicalIndex, contains_identifier, is_identifier_query, query_identifiers
+from .reranker import Reranker
+from .response_cache import ResponseCache
+from .vector_file import VectorFile
+from .execution import chroma_executor
 from .logger import logger
 
 settings = get_settings()
 
+# Share of an embedding model's input length that chunks may use, leaving room
+# for its tokenizer splitting text finer than tiktoken
+CHUNK_INPUT_MARGIN = 0.75
+
+def estimate_tokens(text: str) -> int:
+    # Rough estimate (~4 characters per token) used for batch sizing
+    return len(text) // 4 + 1
+
+def make_chunk_id(doc_id: str, index: int) -> str:
+    return f"{doc_id}_chunk_{index}"
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def normalize_metadata(metadata: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten metadata into the scalar values Chroma can store and filter on.
+
+    Nested dicts become ``parent_child`` keys, lists become comma-separated
+    strings and ``None`` values are dropped. Datetimes are stored as ISO
+    strings plus a numeric ``<key>_ts`` field for range filters.
+    """
+    normalized = {}
+    for key, value in metadata.items():
+        key = f"{prefix}{key}"
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            normalized.update(normalize_metadata(value, prefix=f"{key}_"))
+        elif isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            normalized[key] = value.isoformat()
+            normalized[f"{key}_ts"] = value.timestamp()
+        elif isinstance(value, (bool, int, float, str)):
+            normalized[key] = value
+        elif isinstance(value, (list, tuple, set)):
+            normalized[key] = ", ".join(str(item) for item in value)
+        else:
+            normalized[key] = str(value)
+    return normalized
+
+def filters_to_where(filters: Optional[SearchFilters]) -> Optional[dict]:
+    """Translate search filters into a Chroma ``where`` clause."""
+    if filters is None:
+        return None
+    clauses = []
+    if filters.source_types:
+        clauses.append({"type": {"$in": filters.source_types}})
+    for field in ("space_key", "project", "filename"):
+        value = getattr(filters, field)
+        if value is not None:
+            clauses.append({field: value})
+    if filters.updated_after is not None:
+        clauses.append({"updated_ts": {"$gte": normalize_metadata({"t": filters.updated_after})["t_ts"]}})
+    if filters.updated_before is not None:
+        clauses.append({"updated_ts": {"$lte": normalize_metadata({"t": filters.updated_before})["t_ts"]}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def cosine_similarity_score(a: List[float], b: List[float]) -> float:
+    """Similarity on the same 0-1 scale as Chroma cosine distances in ``search``."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    distance = 1 - (dot / norm if norm else 0.0)
+    return 1 - (distance / 2)
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank + 1)
+    return scores
+
 class VectorStore:
+    """Chunked document store over one persistent Chroma collection.
+
+    Construction is cheap: the Chroma client, the collection and the SQLite
+    side stores are opened on first use (or by ``open`` at startup), so
+    importing this module does no I/O.
+    """
+
     def __init__(self):
-        self.client = chromadb.PersistentClient(
-            path=settings.CHROMA_PERSIST_DIR,
-            settings=Settings(
-                allow_reset=True,
-                anonymized_telemetry=False
+        self._lock = threading.RLock()
+        self._client = None
+        self._embedder: Optional[EmbeddingBackend] = None
+        self._collection = None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        self._lexical_index: Optional[LexicalIndex] = None
+        self._response_cache: Optional[ResponseCache] = None
+        self._catalog: Optional[DocumentCatalog] = None
+        self._reranker: Optional[Reranker] = None
+        self._full_vectors: Optional[VectorFile] = None
+        self._indexes_ready = False
+        self._indexes_lock = asyncio.Lock()
+
+        self.chunkers: Dict[str, TextChunker] = {}
+        self._chunk_max_tokens: Optional[int] = None
+        # Compressed mode: truncated vectors in Chroma, full ones in a VectorFile
+        self.index_dimensions = settings.INDEX_DIMENSIONS or None
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.batch_tokens = settings.EMBEDDING_BATCH_TOKENS
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = chromadb.PersistentClient(
+                    path=settings.CHROMA_PERSIST_DIR,
+                    settings=Settings(
+                        allow_reset=True,
+                        anonymized_telemetry=False
+                    )
+                )
+                logger.info(f"Opened Chroma store at {settings.CHROMA_PERSIST_DIR}")
+            return self._client
+
+    @property
+    def embedder(self) -> EmbeddingBackend:
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = get_embedding_backend(settings.EMBEDDING_MODEL)
+            return self._embedder
+
+    @property
+    def collection(self):
+        with self._lock:
+            if self._collection is None:
+                # Embeddings are computed by the embedding backend and passed in
+                # explicitly, so the collection needs no embedding function
+                self._collection = open_collection(self.client, "documents", self.embedder.name, self.index_dimensions)
+            return self._collection
+
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        with self._lock:
+            if self._embedding_cache is None:
+                self._embedding_cache = EmbeddingCache(
+                    model=settings.EMBEDDING_MODEL,
+                    max_entries=settings.EMBEDDING_CACHE_SIZE,
+                    db_path=os.path.join(settings.CHROMA_PERSIST_DIR, "embedding_cache.sqlite3") if settings.EMBEDDING_CACHE_PERSIST else None,
+                    max_disk_entries=settings.EMBEDDING_CACHE_DISK_SIZE
+                )
+            return self._embedding_cache
+
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        with self._lock:
+            if self._lexical_index is None:
+                self._lexical_index = LexicalIndex(os.path.join(settings.CHROMA_PERSIST_DIR, "lexical_index.sqlite3"))
+            return self._lexical_index
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        with self._lock:
+            if self._response_cache is None:
+                # Document versions are tracked even while lookups are disabled, so
+                # enabling the cache never serves answers built on changed documents
+                self._response_cache = ResponseCache(
+                    self.client,
+                    self.embedder.name,
+                    os.path.join(settings.CHROMA_PERSIST_DIR, "response_cache.sqlite3"),
+                    threshold=settings.RESPONSE_CACHE_THRESHOLD,
+                    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                    max_entries=settings.RESPONSE_CACHE_SIZE
+                )
+            return self._response_cache
+
+    @property
+    def catalog(self) -> DocumentCatalog:
+        with self._lock:
+            if self._catalog is None:
+                self._catalog = DocumentCatalog(os.path.join(settings.CHROMA_PERSIST_DIR, "document_catalog.sqlite3"))
+            return self._catalog
+
+    @property
+    def full_vectors(self) -> VectorFile:
+        with self._lock:
+            if self._full_vectors is None:
+                self._full_vectors = VectorFile(
+                    os.path.join(settings.CHROMA_PERSIST_DIR, "full_vectors"),
+                    dtype=settings.INDEX_RESCORE_DTYPE
+                )
+            return self._full_vectors
+
+    @property
+    def chunk_max_tokens(self) -> int:
+        """``CHUNK_MAX_TOKENS``, lowered if needed so chunks fit the embedding model's input."""
+        with self._lock:
+            if self._chunk_max_tokens is None:
+                max_tokens = settings.CHUNK_MAX_TOKENS
+                limit = self.embedder.max_input_tokens()
+                # Chunks are measured with tiktoken, not the model's tokenizer,
+                # which usually needs more tokens for the same text
+                fit = int(limit * CHUNK_INPUT_MARGIN) if limit else None
+                if fit and fit < max_tokens:
+                    logger.warning(
+                        f"CHUNK_MAX_TOKENS={max_tokens} exceeds what {self.embedder.name} embeds "
+                        f"({limit} tokens); chunking at {fit} tokens instead"
+                    )
+                    max_tokens = fit
+                self._chunk_max_tokens = max_tokens
+            return self._chunk_max_tokens
+
+    @property
+    def reranker(self) -> Reranker:
+        with self._lock:
+            if self._reranker is None:
+                self._reranker = Reranker(
+                    settings.RERANK_MODEL,
+                    batch_size=settings.RERANK_BATCH_SIZE,
+                    pool_size=settings.RERANK_POOL_SIZE
+                )
+            return self._reranker
+
+    def open(self):
+        """Open the client and every side store now instead of on first use."""
+        # Reading each property creates it
+        names = ["collection", "embedding_cache", "lexical_index", "response_cache", "catalog", "chunk_max_tokens"]
+        if self.index_dimensions:
+            names.append("full_vectors")
+        for name in names:
+            getattr(self, name)
+        if settings.RERANK_ENABLED:
+            self.reranker.load()
+
+    def close(self):
+        with self._lock:
+            for store in (self._embedder, self._embedding_cache, self._lexical_index, self._response_cache, self._catalog, self._reranker, self._full_vectors):
+                if store is not None:
+                    store.close()
+            self._client = self._embedder = self._collection = self._reranker = self._full_vectors = None
+            self._embedding_cache = self._lexical_index = self._response_cache = self._catalog = None
+            self._chunk_max_tokens = None
+            self.chunkers = {}
+            self._indexes_ready = False
+
+    def get_chunker(self, strategy: Optional[str] = None) -> TextChunker:
+        strategy = strategy or settings.CHUNK_STRATEGY
+        if strategy not in self.chunkers:
+            self.chunkers[strategy] = TextChunker(max_tokens=self.chunk_max_tokens, strategy=strategy)
+        return self.chunkers[strategy]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedder.embed(texts)
+
+    def _index_vectors(self, embeddings: List[List[float]]) -> List[List[float]]:
+        """The vectors stored in Chroma: Matryoshka-truncated and renormalized in compressed mode."""
+        if not self.index_dimensions:
+            return embeddings
+        matrix = np.asarray(embeddings, dtype=np.float32)[:, :self.index_dimensions]
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return matrix.tolist()
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed search queries, serving repeated queries from the embedding cache."""
+        embeddings = await self.embedding_cache.get_many(queries)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_queries = [queries[i] for i in missing]
+            fresh = await self.embed(missing_queries)
+            await self.embedding_cache.put_many(missing_queries, fresh)
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+        return embeddings
+
+    def _get_existing_chunks(self, where: dict) -> Dict[str, dict]:
+        existing = self.collection.get(where=where, include=["metadatas"])
+        return dict(zip(existing["ids"], existing["metadatas"]))
+
+    async def _delete_ids(self, ids: List[str]):
+        for start in range(0, len(ids), settings.DELETE_BATCH_SIZE):
+            await chroma_executor.run(self.collection.delete, ids=ids[start:start + settings.DELETE_BATCH_SIZE])
+        await self.lexical_index.delete_ids(ids)
+        if self.index_dimensions and ids:
+            await chroma_executor.run(self.full_vectors.delete, ids)
+
+    async def ensure_indexes(self):
+        """Backfill the lexical index and document catalog from the collection if they were never built."""
+        if self._indexes_ready:
+            return
+        async with self._indexes_lock:
+            if self._indexes_ready:
+                return
+            indexed, catalogued, stored = await asyncio.gather(
+                chroma_executor.run(self.lexical_index.count),
+                chroma_executor.run(self.catalog.count),
+                chroma_executor.run(self.collection.count)
             )
-        )
-        
-        self.embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-            api_key=settings.OPENAI_API_KEY,
-            model_name=settings.EMBEDDING_MODEL
-        )
-        
-        self.collection = self.client.get_or_create_collection(
-            name="documents",
-            embedding_function=self.embedding_function,
-            metadata={"hnsw:space": "cosine"}
-        )
-        
-        self.chunker = TextChunker()
+            build_lexical = indexed == 0 and stored > 0
+            build_catalog = catalogued == 0 and stored > 0
+            if build_lexical or build_catalog:
+                building = [name for name, build in (("lexical index", build_lexical), ("document catalog", build_catalog)) if build]
+                logger.info(f"Building {' and '.join(building)} for {stored} chunks")
+                # Sizes are approximated from chunk lengths, overlap included
+                documents: Dict[str, list] = {}
+                for offset in range(0, stored, self.batch_size):
+                    page = await chroma_executor.run(
+                        self.collection.get,
+                        limit=self.batch_size,
+                        offset=offset,
+                        include=["documents", "metadatas"]
+                    )
+                    if build_lexical:
+                        await self.lexical_index.upsert([
+                            (chunk_id, metadata.get("parent_id", chunk_id), text)
+                            for chunk_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+                        ])
+                    if build_catalog:
+                        for chunk_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                            parent_id = metadata.get("parent_id", chunk_id)
+                            entry = documents.setdefault(
+                                parent_id,
+                                [parent_id, document_name(parent_id, metadata), metadata.get("type", ""), document_scope(metadata), 0, 0]
+                            )
+                            entry[4] += 1
+                            entry[5] += len(text)
+                await self.catalog.upsert([tuple(entry) for entry in documents.values()])
+            self._indexes_ready = True
 
-    async def add_document(self, doc_id: str, text: str, metadata: dict):
+    async def add_documents_bulk(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Chunk documents as a stream and embed/upsert their chunks in sized batches.
+
+        Each document is a dict with ``id``, ``text`` and ``metadata`` keys, where
+        ``text`` is a string or an iterable of text pieces (e.g. pages or file
+        blocks), and an optional ``chunking`` strategy name. The document id becomes the ``parent_id`` of its chunks. Chunks
+        whose content hash matches what is already stored are not re-embedded,
+        and stored chunks of these documents that were not produced again are
+        deleted. Only one embedding batch of chunks is held at a time.
+        """
         try:
-            # Split text into chunks
-            chunks = self.chunker.get_chunks_with_overlap(text)
-            
-            # Prepare batch data
-            chunk_texts = []
-            chunk_ids = []
-            chunk_metadata = []
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{doc_id}_chunk_{i}"
-                chunk_metadata_entry = {
-                    **metadata,
-                    **chunk["metadata"],
-                    "parent_id": doc_id
-                }
-                
-                chunk_texts.append(chunk["text"])
-                chunk_ids.append(chunk_id)
-                chunk_metadata.append(chunk_metadata_entry)
-            
-            # Batch add chunks to collection
-            self.collection.add(
-                documents=chunk_texts,
-                metadatas=chunk_metadata,
-                ids=chunk_ids
+            started = time.perf_counter()
+            await self.ensure_indexes()
+
+            # Look up what is already stored for these documents
+            parent_ids = [document["id"] for document in documents]
+            existing = {}
+            for start in range(0, len(parent_ids), self.batch_size):
+                existing.update(await chroma_executor.run(
+                    self._get_existing_chunks,
+                    {"parent_id": {"$in": parent_ids[start:start + self.batch_size]}}
+                ))
+
+            counts = {"chunks": 0, "embedded": 0, "metadata_updated": 0, "batches": 0}
+            to_embed: List[Dict[str, Any]] = []
+            to_update: List[Dict[str, Any]] = []
+            embed_tokens = 0
+
+            async def flush_embeddings():
+                nonlocal to_embed, embed_tokens
+                if not to_embed:
+                    return
+                texts = [item["text"] for item in to_embed]
+                embeddings = await self.embed(texts)
+                if self.index_dimensions:
+                    await chroma_executor.run(self.full_vectors.put, [item["id"] for item in to_embed], embeddings)
+                await chroma_executor.run(
+                    self.collection.upsert,
+                    ids=[item["id"] for item in to_embed],
+                    embeddings=self._index_vectors(embeddings),
+                    documents=texts,
+                    metadatas=[item["metadata"] for item in to_embed]
+                )
+                await self.lexical_index.upsert([
+                    (item["id"], item["metadata"]["parent_id"], item["text"]) for item in to_embed
+                ])
+                await self.response_cache.invalidate({item["metadata"]["parent_id"] for item in to_embed})
+                counts["embedded"] += len(to_embed)
+                counts["batches"] += 1
+                to_embed = []
+                embed_tokens = 0
+
+            async def flush_updates():
+                nonlocal to_update
+                if not to_update:
+                    return
+                await chroma_executor.run(
+                    self.collection.update,
+                    ids=[item["id"] for item in to_update],
+                    metadatas=[item["metadata"] for item in to_update]
+                )
+                counts["metadata_updated"] += len(to_update)
+                to_update = []
+
+            # Chunks are produced lazily and flushed once a batch fills up;
+            # only new or changed chunks need embedding, and unchanged text
+            # with changed metadata is updated in place
+            new_ids = set()
+            catalog_rows = []
+            size = 0
+
+            def counted(pieces):
+                # Measures the document's text as the chunker consumes it
+                nonlocal size
+                for piece in pieces:
+                    size += len(piece)
+                    yield piece
+
+            for document in documents:
+                doc_id = document["id"]
+                metadata = normalize_metadata(document.get("metadata", {}))
+                text = document["text"]
+                pieces = [text] if isinstance(text, str) else text
+                size = 0
+                chunker = self.get_chunker(document.get("chunking"))
+                chunk_count = 0
+                for i, chunk in enumerate(chunker.iter_chunks(counted(pieces))):
+                    chunk_count += 1
+                    item = {
+                        "id": make_chunk_id(doc_id, i),
+                        "text": chunk,
+                        "metadata": {
+                            **metadata,
+                            "chunk_index": i,
+                            "parent_id": doc_id,
+                            "content_hash": content_hash(chunk)
+                        }
+                    }
+                    new_ids.add(item["id"])
+                    counts["chunks"] += 1
+
+                    stored = existing.get(item["id"])
+                    if stored is None or stored.get("content_hash") != item["metadata"]["content_hash"]:
+                        tokens = estimate_tokens(chunk)
+                        if to_embed and (len(to_embed) >= self.batch_size or embed_tokens + tokens > self.batch_tokens):
+                            await flush_embeddings()
+                        to_embed.append(item)
+                        embed_tokens += tokens
+                    elif stored != item["metadata"]:
+                        to_update.append(item)
+                        if len(to_update) >= self.batch_size:
+                            await flush_updates()
+                catalog_rows.append((
+                    doc_id, document_name(doc_id, metadata), metadata.get("type", ""), document_scope(metadata), chunk_count, size
+                ))
+
+            await flush_embeddings()
+            await flush_updates()
+
+            stale_ids = [chunk_id for chunk_id in existing if chunk_id not in new_ids]
+            stale_parents = {existing[chunk_id]["parent_id"] for chunk_id in stale_ids}
+            await self._delete_ids(stale_ids)
+            await self.response_cache.invalidate(stale_parents - {None})
+
+            # Documents that now have no chunks leave the catalog
+            await self.catalog.upsert([row for row in catalog_rows if row[4] > 0])
+            await self.catalog.delete([row[0] for row in catalog_rows if row[4] == 0])
+
+            elapsed = time.perf_counter() - started
+            stats = {
+                "documents": len(documents),
+                "chunks": counts["chunks"],
+                "embedded": counts["embedded"],
+                "unchanged": counts["chunks"] - counts["embedded"],
+                "metadata_updated": counts["metadata_updated"],
+                "deleted": len(stale_ids),
+                "batches": counts["batches"],
+                "elapsed_seconds": round(elapsed, 3),
+                "chunks_per_second": round(counts["chunks"] / elapsed, 1) if elapsed > 0 else 0.0
+            }
+            logger.info(
+                f"Bulk added {stats['documents']} documents ({stats['chunks']} chunks, "
+                f"{stats['embedded']} embedded, {stats['unchanged']} unchanged, {stats['deleted']} deleted) in "
+                f"{stats['batches']} batches, {stats['elapsed_seconds']}s, "
+                f"{stats['chunks_per_second']} chunks/s"
             )
-            
-            logger.info(f"Added document {doc_id} with {len(chunks)} chunks to vector store")
-            
+            return stats
+
         except Exception as e:
-            logger.error(f"Error adding document to vector store: {e}")
+            logger.error(f"Error bulk adding documents to vector store: {e}")
             raise
 
-    async def delete_document(self, doc_id: str):
+    async def add_document(self, doc_id: str, text: str, metadata: dict) -> Dict[str, Any]:
+        return await self.add_documents_bulk([{
+            "id": doc_id,
+            "text": text,
+            "metadata": metadata
+        }])
+
+    async def get_document_ids(self, scope: str, source: Optional[str] = None) -> set:
+        """Ids of the stored documents in a Jira project or Confluence space scope, from the catalog."""
+        await self.ensure_indexes()
+        return set(await self.catalog.document_ids(scope, source))
+
+    async def list_documents(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """A page of the document catalog; see ``DocumentCatalog.list``."""
+        await self.ensure_indexes()
+        return await self.catalog.list(limit, cursor, **filters)
+
+    async def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        await self.ensure_indexes()
+        return await self.catalog.get(doc_id)
+
+    async def delete_documents(
+        self,
+        doc_ids: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        scope: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Delete every document matching any of the given ids, id prefix or scope.
+
+        Chunk ids are resolved from the catalog's chunk counts and deleted by
+        id in large batches, without scanning chunk metadata. Ids missing from
+        the catalog fall back to a ``parent_id`` filter. ``scope`` is a Jira
+        project or Confluence space, as built by ``jira_scope`` and
+        ``confluence_scope``.
+        """
+        if not (doc_ids or prefix or scope):
+            raise ValueError("Nothing to delete: give document ids, a prefix or a scope")
         try:
-            # Delete all chunks associated with the document
-            self.collection.delete(
-                where={"parent_id": doc_id}
+            started = time.perf_counter()
+            await self.ensure_indexes()
+            counts = await self.catalog.chunk_counts(doc_ids, prefix, scope)
+            chunk_ids = [make_chunk_id(doc_id, i) for doc_id, count in counts.items() for i in range(count)]
+            await self._delete_ids(chunk_ids)
+
+            uncatalogued = [doc_id for doc_id in dict.fromkeys(doc_ids or []) if doc_id not in counts]
+            for start in range(0, len(uncatalogued), self.batch_size):
+                batch = uncatalogued[start:start + self.batch_size]
+                stored = await chroma_executor.run(self.collection.get, where={"parent_id": {"$in": batch}}, include=[])
+                await self._delete_ids(stored["ids"])
+
+            deleted = list(counts) + uncatalogued
+            await self.catalog.delete(deleted)
+            await self.response_cache.invalidate(deleted)
+            stats = {
+                "documents": len(counts),
+                "chunks": len(chunk_ids),
+                "elapsed_seconds": round(time.perf_counter() - started, 3)
+            }
+            logger.info(
+                f"Deleted {stats['documents']} documents ({stats['chunks']} chunks) "
+                f"from vector store in {stats['elapsed_seconds']}s"
             )
-            logger.info(f"Deleted document {doc_id} from vector store")
+            return stats
         except Exception as e:
-            logger.error(f"Error deleting document from vector store: {e}")
+            logger.error(f"Error deleting documents from vector store: {e}")
             raise
 
-    async def search(self, query: str, n_results: int = 5, min_relevance_score: float = 0.7) -> Dict[str, Any]:
-        try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results * 2,  # Get more results initially for filtering
-                include=["metadatas", "documents", "distances"]
-            )
-            
-            # Filter and process results
-            processed_results = []
-            seen_docs = set()
-            
-            for i, (doc, metadata, distance) in enumerate(zip(
+    async def delete_document(self, doc_id: str) -> Dict[str, Any]:
+        return await self.delete_documents([doc_id])
+
+    def _rescore(self, results: Dict[str, Any], query_embeddings: List[List[float]], limit: int) -> Dict[str, Any]:
+        """Re-rank each row of a first-pass query by full-precision cosine distance and keep ``limit``."""
+        if self.full_vectors.dim is None:
+            # Nothing stored yet, so there is nothing to rescore with
+            return {key: [row[:limit] for row in results[key]] for key in ("ids", "documents", "metadatas", "distances")}
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        rescored = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        for row, query in enumerate(queries):
+            if not results["ids"][row]:
+                for key in rescored:
+                    rescored[key].append([])
+                continue
+            vectors, found = self.full_vectors.get(results["ids"][row])
+            # Chunks without a stored full vector keep their first-pass distance
+            distances = np.where(found, 1 - vectors @ query, np.asarray(results["distances"][row], dtype=np.float32))
+            order = np.argsort(distances, kind="stable")[:limit].tolist()
+            for key in ("ids", "documents", "metadatas"):
+                rescored[key].append([results[key][row][i] for i in order])
+            rescored["distances"].append([float(distances[i]) for i in order])
+        return rescored
+
+    async def _query(self, query_embeddings: List[List[float]], limit: int, where: Optional[dict]) -> Dict[str, Any]:
+        """Nearest chunks per query, as a Chroma query result.
+
+        In compressed mode the truncated index is searched for
+        ``INDEX_RESCORE_FACTOR`` times as many candidates, which are then
+        rescored with their full vectors.
+        """
+        first_pass = limit * settings.INDEX_RESCORE_FACTOR if self.index_dimensions else limit
+        results = await chroma_executor.run(
+            self.collection.query,
+            query_embeddings=self._index_vectors(query_embeddings),
+            n_results=first_pass,
+            where=where,
+            include=["metadatas", "documents", "distances"]
+        )
+        if self.index_dimensions:
+            results = await chroma_executor.run(self._rescore, results, query_embeddings, limit)
+        return results
+
+    async def _dense_candidates(self, query_embedding: List[float], limit: int, where: Optional[dict]) -> List[Dict[str, Any]]:
+        results = await self._query([query_embedding], limit, where)
+        return [
+            {
+                "id": chunk_id,
+                "content": doc,
+                "metadata": metadata,
+                # Convert distance to similarity score (0-1)
+                "similarity_score": 1 - (distance / 2)  # Assuming cosine distance
+            }
+            for chunk_id, doc, metadata, distance in zip(
+                results["ids"][0],
                 results["documents"][0],
                 results["metadatas"][0],
                 results["distances"][0]
-            )):
-                # Convert distance to similarity score (0-1)
-                similarity_score = 1 - (distance / 2)  # Assuming cosine distance
-                
-                if similarity_score < min_relevance_score:
-                    continue
-                    
-                parent_id = metadata["parent_id"]
-                if parent_id not in seen_docs and len(processed_results) < n_results:
-                    seen_docs.add(parent_id)
-                    processed_results.append({
-                        "content": doc,
-                        "metadata": metadata,
-                        "similarity_score": similarity_score
-                    })
-            
+            )
+        ]
+
+    async def _lexical_candidates(
+        self,
+        hits: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]],
+        where: Optional[dict]
+    ) -> List[Dict[str, Any]]:
+        if not hits:
+            return []
+        # In compressed mode Chroma only has truncated vectors; full ones are read below
+        needs_embeddings = query_embedding is not None and not self.index_dimensions
+        include = ["documents", "metadatas"] + (["embeddings"] if needs_embeddings else [])
+        # The filter drops hits outside the requested scope
+        stored = await chroma_executor.run(
+            self.collection.get,
+            ids=[hit["id"] for hit in hits],
+            where=where,
+            include=include
+        )
+        by_id = {chunk_id: i for i, chunk_id in enumerate(stored["ids"])}
+        if query_embedding is not None and self.index_dimensions:
+            vectors, _ = await chroma_executor.run(self.full_vectors.get, stored["ids"])
+            stored["embeddings"] = vectors.tolist()
+
+        candidates = []
+        for hit in hits:
+            i = by_id.get(hit["id"])
+            if i is None:
+                continue
+            candidates.append({
+                "id": hit["id"],
+                "content": stored["documents"][i],
+                "metadata": stored["metadatas"][i],
+                "similarity_score": (
+                    cosine_similarity_score(query_embedding, stored["embeddings"][i])
+                    if query_embedding is not None else None
+                ),
+                "lexical_score": hit["score"]
+            })
+        return candidates
+
+    def _fuse(
+        self,
+        dense: List[Dict[str, Any]],
+        lexical: List[Dict[str, Any]],
+        lexical_hits: List[Dict[str, Any]],
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        """Fuse the two rankings, then keep the best chunk per document."""
+        candidates = {candidate["id"]: candidate for candidate in dense + lexical}
+        lexical_ranking = [hit["id"] for hit in lexical_hits if hit["id"] in candidates]
+        fused = reciprocal_rank_fusion(
+            [[candidate["id"] for candidate in dense], lexical_ranking],
+            k=settings.SEARCH_RRF_K
+        )
+
+        processed_results = []
+        seen_docs = set()
+        for chunk_id in sorted(fused, key=fused.get, reverse=True):
+            candidate = candidates[chunk_id]
+            parent_id = candidate["metadata"]["parent_id"]
+            if parent_id not in seen_docs and len(processed_results) < n_results:
+                seen_docs.add(parent_id)
+                processed_results.append({
+                    "content": candidate["content"],
+                    "metadata": candidate["metadata"],
+                    "similarity_score": candidate["similarity_score"],
+                    "lexical_score": candidate.get("lexical_score"),
+                    "score": fused[chunk_id]
+                })
+        return processed_results
+
+    async def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        min_relevance_score: float = 0.7,
+        filters: Optional[SearchFilters] = None,
+        rerank: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Hybrid search: dense and BM25 candidates merged by reciprocal rank fusion.
+
+        ``filters`` are pushed down to Chroma as a ``where`` clause, so only
+        chunks in scope are ranked. Queries made only of identifiers (e.g.
+        ``ABC-1234``) are answered from the lexical index alone when it has
+        matches, skipping the embedding call. Otherwise candidates must reach
+        ``min_relevance_score``, except BM25 hits containing an identifier
+        from the query, whose dense similarity is no measure of the match.
+
+        Several chunks of one document may match, so candidates are fetched in
+        rounds of growing size until ``n_results`` distinct documents pass,
+        the candidates run out or fall below the threshold, or
+        ``SEARCH_MAX_CANDIDATES`` is reached.
+
+        With ``rerank`` (default ``RERANK_ENABLED``), the best ``RERANK_TOP_N``
+        documents are re-scored by the cross-encoder and the top ``n_results``
+        kept; past ``RERANK_BUDGET_MS`` the fused order is used instead. The
+        time spent in each stage is returned under ``timings``.
+        """
+        try:
+            started = time.perf_counter()
+            rerank = settings.RERANK_ENABLED if rerank is None else rerank
+            wanted = max(n_results, settings.RERANK_TOP_N) if rerank else n_results
+            timings = {"embed_ms": 0.0}
+
+            await self.ensure_indexes()
+            where = filters_to_where(filters)
+            limit = min(wanted * 2, settings.SEARCH_MAX_CANDIDATES)
+            query_embedding = None
+            exact = None
+            rounds = 0
+
+            while True:
+                rounds += 1
+                # The lexical index cannot filter on metadata, so take more hits
+                # when some will be dropped by the filter
+                lexical_limit = limit * 4 if where else limit
+                lexical_hits = await self.lexical_index.search(query, lexical_limit) if settings.HYBRID_SEARCH else []
+
+                dense = []
+                lexical = []
+                if exact is None:
+                    exact = False
+                    if lexical_hits and is_identifier_query(query):
+                        lexical = await self._lexical_candidates(lexical_hits, None, where)
+                        exact = bool(lexical)
+                elif exact:
+                    lexical = await self._lexical_candidates(lexical_hits, None, where)
+
+                if exact:
+                    exhausted = len(lexical_hits) < lexical_limit
+                else:
+                    if query_embedding is None:
+                        embed_started = time.perf_counter()
+                        query_embedding = (await self.embed_queries([query]))[0]
+                        timings["embed_ms"] = (time.perf_counter() - embed_started) * 1000
+                    dense = await self._dense_candidates(query_embedding, limit, where)
+                    # Results come best first, so once the last one misses the
+                    # threshold a larger fetch cannot add passing chunks
+                    exhausted = len(dense) < limit or (bool(dense) and dense[-1]["similarity_score"] < min_relevance_score)
+
+                    dense_ids = {candidate["id"] for candidate in dense}
+                    lexical = await self._lexical_candidates(
+                        [hit for hit in lexical_hits if hit["id"] not in dense_ids], query_embedding, where
+                    )
+                    # Chunks found by both retrievers keep their BM25 score
+                    lexical_scores = {hit["id"]: hit["score"] for hit in lexical_hits}
+                    for candidate in dense:
+                        candidate["lexical_score"] = lexical_scores.get(candidate["id"])
+                    dense = [c for c in dense if c["similarity_score"] >= min_relevance_score]
+                    # A chunk BM25 found for an identifier in the query (e.g.
+                    # "status of ABC-1234") may embed far from the question
+                    identifiers = query_identifiers(query)
+                    lexical = [
+                        c for c in lexical
+                        if c["similarity_score"] >= min_relevance_score or contains_identifier(c["content"], identifiers)
+                    ]
+
+                processed_results = self._fuse(dense, lexical, lexical_hits, wanted)
+                if len(processed_results) >= wanted or exhausted or limit >= settings.SEARCH_MAX_CANDIDATES:
+                    break
+                limit = min(limit * settings.SEARCH_FETCH_GROWTH, settings.SEARCH_MAX_CANDIDATES)
+
+            if rounds > 1:
+                logger.debug(f"Search needed {rounds} rounds ({limit} candidates) for {len(processed_results)} results")
+            timings["retrieve_ms"] = (time.perf_counter() - started) * 1000 - timings["embed_ms"]
+
+            # Exact identifier matches are already as precise as it gets
+            reranked = False
+            if rerank and not exact and len(processed_results) > 1:
+                scores, timings["rerank_ms"] = await self.reranker.score(
+                    query,
+                    [result["content"] for result in processed_results],
+                    settings.RERANK_BUDGET_MS
+                )
+                if scores is not None:
+                    for result, score in zip(processed_results, scores):
+                        result["rerank_score"] = score
+                    processed_results.sort(key=lambda result: result["rerank_score"], reverse=True)
+                    if settings.RERANK_MIN_SCORE is not None:
+                        processed_results = [
+                            result for result in processed_results if result["rerank_score"] >= settings.RERANK_MIN_SCORE
+                        ]
+                    reranked = True
+
+            timings["total_ms"] = (time.perf_counter() - started) * 1000
             return {
-                "results": processed_results,
-                "total_chunks": len(results["documents"][0])
+                "results": processed_results[:n_results],
+                "total_chunks": len(dense) + len(lexical),
+                "rounds": rounds,
+                "candidates_fetched": limit,
+                "reranked": reranked,
+                "timings": {stage: round(ms, 1) for stage, ms in timings.items()}
             }
-            
+
         except Exception as e:
             logger.error(f"Error searching vector store: {e}")
             raise
 
-vector_store = VectorStore()</content>
\ No newline at end of file
+    def _select_batch(self, results: Dict[str, Any], n_results: int, min_relevance_score: float) -> Tuple[List[List[int]], np.ndarray]:
+        """Pick, per query, the best passing chunk of up to ``n_results`` distinct documents.
+
+        Works on the whole (queries x candidates) result matrix at once: a
+        flat key of (query row, parent) finds each document's first, i.e.
+        best, chunk in a row, and a running rank within the row caps it at
+        ``n_results``. Returns the selected columns per row and the
+        similarity matrix.
+        """
+        rows = len(results["ids"])
+        width = max((len(ids) for ids in results["ids"]), default=0)
+        distances = np.full((rows, width), np.inf)
+        parents = np.full((rows, width), "", dtype=object)
+        for row, (row_distances, row_metadatas) in enumerate(zip(results["distances"], results["metadatas"])):
+            distances[row, :len(row_distances)] = row_distances
+            parents[row, :len(row_metadatas)] = [metadata["parent_id"] for metadata in row_metadatas]
+
+        # Convert distance to similarity score (0-1), assuming cosine distance
+        similarity = 1 - (distances / 2)
+        passing = np.flatnonzero(similarity.ravel() >= min_relevance_score)
+        _, parent_codes = np.unique(parents.ravel()[passing].astype(str), return_inverse=True)
+        row_of = passing // max(width, 1)
+        keys = row_of * (int(parent_codes.max(initial=0)) + 1) + parent_codes
+        _, first = np.unique(keys, return_index=True)
+        best = np.sort(passing[first])
+
+        best_rows = best // max(width, 1)
+        row_starts = np.searchsorted(best_rows, best_rows, side="left")
+        rank = np.arange(len(best)) - row_starts
+        best = best[rank < n_results]
+
+        selected: List[List[int]] = [[] for _ in range(rows)]
+        for position in best.tolist():
+            selected[position // width].append(position % width)
+        return selected, similarity
+
+    async def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        min_relevance_score: float = 0.7,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Dict[str, Any]]:
+        """Dense search for many queries at once, for evaluation and bulk jobs.
+
+        Queries are embedded in batched requests (through the embedding cache)
+        and sent to Chroma as one multi-query call per batch; threshold and
+        per-document dedup run on the whole result matrix. Queries that end
+        up short of ``n_results`` documents are re-queried together with a
+        larger fetch, as in ``search``. Lexical matching is not used.
+        """
+        try:
+            where = filters_to_where(filters)
+            embeddings: List[List[float]] = []
+            for start in range(0, len(queries), self.batch_size):
+                embeddings.extend(await self.embed_queries(queries[start:start + self.batch_size]))
+
+            outputs: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+            pending = list(range(len(queries)))
+            limit = min(n_results * 2, settings.SEARCH_MAX_CANDIDATES)
+            rounds = 0
+
+            while pending:
+                rounds += 1
+                retry = []
+                for start in range(0, len(pending), self.batch_size):
+                    batch = pending[start:start + self.batch_size]
+                    results = await self._query([embeddings[i] for i in batch], limit, where)
+                    selected, similarity = self._select_batch(results, n_results, min_relevance_score)
+
+                    for row, query_index in enumerate(batch):
+                        fetched = len(results["ids"][row])
+                        outputs[query_index] = {
+                            "results": [
+                                {
+                                    "content": results["documents"][row][column],
+                                    "metadata": results["metadatas"][row][column],
+                                    "similarity_score": float(similarity[row, column])
+                                }
+                                for column in selected[row]
+                            ],
+                            "total_chunks": fetched,
+                            "rounds": rounds,
+                            "candidates_fetched": limit
+                        }
+                        # Same stopping rule as search: enough documents, no
+                        # more candidates, or the weakest one already fails
+                        exhausted = fetched < limit or (fetched and similarity[row, fetched - 1] < min_relevance_score)
+                        if len(selected[row]) < n_results and not exhausted:
+                            retry.append(query_index)
+
+                if limit >= settings.SEARCH_MAX_CANDIDATES:
+                    break
+                pending = retry
+                limit = min(limit * settings.SEARCH_FETCH_GROWTH, settings.SEARCH_MAX_CANDIDATES)
+
+            logger.info(f"Batch searched {len(queries)} queries in {rounds} rounds")
+            return outputs
+
+        except Exception as e:
+            logger.error(f"Error batch searching vector store: {e}")
+            raise
+
+vector_store = VectorStore()
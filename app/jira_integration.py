@@ -1,17 +1,12 @@
-from atlassian import Jira
+from .core.clients import get_jira
 from loguru import logger
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class JiraIntegration:
     def __init__(self):
-        self.jira = Jira(
-            url=os.getenv('JIRA_URL'),
-            username=os.getenv('JIRA_USERNAME'),
-            password=os.getenv('JIRA_API_TOKEN')
-        )
+        self.jira = get_jira()
 
     def get_project_issues(self, project_key: str):
         try:
@@ -1,102 +1,49 @@
-from fastapi import FastAPI, UploadFile, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
-import chromadb
-import os
-from datetime import datetime
-from pydantic import BaseModel
-import json
-from loguru import logger
-
-app = FastAPI()
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Initialize ChromaDB
-client = chromadb.Client()
-collection = client.create_collection("documents")
-
-class ChatMessage(BaseModel):
-    message: str
-    context: Optional[List[str]] = []
-
-class DocumentInfo(BaseModel):
-    id: str
-    name: str
-    timestamp: str
-
-@app.post("/upload")
-async def upload_document(file: UploadFile):
-    try:
-        content = await file.read()
-        doc_id = f"doc_{datetime.now().timestamp()}"
-        
-        # Index document in ChromaDB
-        collection.add(
-            documents=[content.decode()],
-            metadatas=[{"name": file.filename}],
-            ids=[doc_id]
-        )
-        
-        return {"message": "Document uploaded successfully", "id": doc_id}
-    except Exception as e:
-        logger.error(f"Error uploading document: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/documents", response_model=List[DocumentInfo])
-async def list_documents():
-    try:
-        docs = collection.get()
-        return [
-            DocumentInfo(
-                id=doc_id,
-                name=metadata["name"],
-                timestamp=doc_id.split("_")[1]
-            )
-            for doc_id, metadata in zip(docs["ids"], docs["metadatas"])
-        ]
-    except Exception as e:
-        logger.error(f"Error listing documents: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.delete("/documents/{doc_id}")
-async def delete_document(doc_id: str):
-    try:
-        collection.delete(ids=[doc_id])
-        return {"message": "Document deleted successfully"}
-    except Exception as e:
-        logger.error(f"Error deleting document: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/chat")
-async def chat(message: ChatMessage):
-    try:
-        # Query relevant documents
-        results = collection.query(
-            query_texts=[message.message],
-            n_results=3
-        )
-        
-        # Process with context and return response
-        context = results["documents"][0] if results["documents"] else []
-        
-        # Here you would typically call OpenAI API with the context
-        # For now, returning a simple response
-        return {
-            "response": "This is a placeholder response. Implement OpenAI integration.",
-            "context": context
-        }
-    except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+from .core.execution import chroma_executor, parser_pool
+from .core.logger import logger
+from .core.vector_store import vector_store
+from .routers import chat, confluence, documents, jira, jobs, search, system
+
+def create_app() -> FastAPI:
+    """Build the API; every router shares the one persistent ``vector_store``."""
+    app = FastAPI(title="Document Chat API")
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    @app.on_event("startup")
+    async def open_vector_store():
+        # Open Chroma off the event loop before the first request needs it
+        await chroma_executor.run(vector_store.open)
+        logger.info("Vector store ready")
+
+    # Router hooks run after the startup hook above and before the shutdown
+    # hook below, so job workers start on an open store and stop before it closes
+    app.include_router(documents.router, prefix="/documents", tags=["documents"])
+    app.include_router(chat.router, prefix="/chat", tags=["chat"])
+    app.include_router(search.router, prefix="/search", tags=["search"])
+    app.include_router(jira.router, prefix="/jira", tags=["jira"])
+    app.include_router(confluence.router, prefix="/confluence", tags=["confluence"])
+    app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+    app.include_router(system.router, tags=["system"])
+
+    @app.on_event("shutdown")
+    async def close_vector_store():
+        vector_store.close()
+        # Stop the parser processes so they do not outlive the app
+        parser_pool.shutdown()
+
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -12,4 +12,12 @@ class Document(BaseModel):
 class ChatMessage(BaseModel):
     role: str
     content: str
-    timestamp: Optional[datetime] = None
\ No newline at end of file
+    timestamp: Optional[datetime] = None
+
+class SearchFilters(BaseModel):
+    source_types: Optional[List[str]] = None  # e.g. jira_issue, confluence_page
+    space_key: Optional[str] = None
+    project: Optional[str] = None
+    filename: Optional[str] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
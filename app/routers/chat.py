@@ -1,13 +1,19 @@
-<content>from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-import openai
+from typing import List, Optional, Tuple, AsyncIterator
+import json
 from ..core.config import get_settings
+from ..core.clients import get_openai_client
+from ..core.execution import openai_limiter
 from ..core.vector_store import vector_store
 from ..core.logger import logger
+from ..models import SearchFilters
+from ..services.context_assembler import ContextAssembler
 
 router = APIRouter()
 settings = get_settings()
+context_assembler = ContextAssembler()
 
 class ChatMessage(BaseModel):
     role: str
@@ -15,62 +21,184 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: List[ChatMessage]
+    filters: Optional[SearchFilters] = None
 
 class ChatResponse(BaseModel):
     response: str
     context: Optional[List[dict]] = None
+    usage: Optional[dict] = None
+
+async def prepare_chat(request: ChatRequest) -> Tuple[List[dict], List[dict], dict]:
+    """Retrieve context for the last user message and build OpenAI messages within the token budget."""
+    # Get relevant context from vector store
+    last_user_message = next(
+        (msg for msg in reversed(request.messages) if msg.role == "user"),
+        None
+    )
+    
+    if not last_user_message:
+        raise HTTPException(status_code=400, detail="No user message found")
+    
+    # Fetch more candidates than fit; the assembler keeps the most relevant
+    # ones that the context budget allows
+    search_results = await vector_store.search(
+        last_user_message.content,
+        n_results=settings.CHAT_SEARCH_RESULTS,
+        min_relevance_score=settings.CHAT_MIN_RELEVANCE_SCORE,
+        filters=request.filters
+    )
+    
+    candidates = []
+    for result in search_results["results"]:
+        candidates.append({
+            "content": result["content"],
+            "source": result["metadata"].get("filename", "Unknown"),
+            "document_id": result["metadata"]["parent_id"],
+            # Exact identifier matches are found without an embedding
+            "relevance": f"{result['similarity_score']:.2f}" if result["similarity_score"] is not None else "exact match"
+        })
+    
+    history = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+    messages, context_chunks, usage = context_assembler.assemble(history, candidates)
+    logger.debug(f"Planned prompt token usage: {usage}")
+    return context_chunks, messages, usage
+
+async def response_cache_key(request: ChatRequest) -> Optional[dict]:
+    """Embedding and scope to look up a cached answer, for cacheable requests only."""
+    # Answers depend on the conversation, so only opening questions are cached
+    if not settings.RESPONSE_CACHE_ENABLED or len(request.messages) != 1 or request.messages[0].role != "user":
+        return None
+    question = request.messages[0].content
+    scope = json.dumps({
+        "model": settings.MODEL_NAME,
+        "filters": request.filters.model_dump(mode="json") if request.filters else None
+    }, sort_keys=True)
+    embedding = (await vector_store.embed_queries([question]))[0]
+    return {"embedding": embedding, "question": question, "scope": scope}
+
+async def cache_snapshot(cache_key: Optional[dict], context_chunks: List[dict]) -> Optional[dict]:
+    if cache_key is None:
+        return None
+    return await vector_store.response_cache.snapshot([chunk["document_id"] for chunk in context_chunks])
+
+async def cache_response(cache_key: Optional[dict], sources: Optional[dict], response: str, context_chunks: List[dict]):
+    # Without context there is no document whose change would invalidate the
+    # answer, so newly ingested documents could never replace it
+    if cache_key is not None and context_chunks:
+        await vector_store.response_cache.store(
+            cache_key["embedding"],
+            cache_key["question"],
+            cache_key["scope"],
+            response,
+            context_chunks,
+            sources
+        )
+
+def cached_usage(cached: dict) -> dict:
+    return {"cached": True, "similarity_score": cached["similarity_score"]}
 
 @router.post("/", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     try:
-        # Get relevant context from vector store
-        last_user_message = next(
-            (msg for msg in reversed(request.messages) if msg.role == "user"),
-            None
-        )
-        
-        if not last_user_message:
-            raise HTTPException(status_code=400, detail="No user message found")
-        
-        # Get context with similarity scores
-        search_results = await vector_store.search(
-            last_user_message.content,
-            n_results=3,
-            min_relevance_score=0.7
-        )
-        
-        # Prepare context string from relevant chunks
-        context_chunks = []
-        for result in search_results["results"]:
-            context_chunks.append({
-                "content": result["content"],
-                "source": result["metadata"].get("filename", "Unknown"),
-                "relevance": f"{result['similarity_score']:.2f}"
-            })
+        cache_key = await response_cache_key(request)
+        if cache_key is not None:
+            cached = await vector_store.response_cache.lookup(cache_key["embedding"], cache_key["scope"])
+            if cached is not None:
+                return ChatResponse(response=cached["response"], context=cached["context"], usage=cached_usage(cached))
         
-        context_text = "\n\n".join([chunk["content"] for chunk in context_chunks])
-        
-        # Prepare messages for OpenAI
-        system_message = {
-            "role": "system",
-            "content": f"You are a helpful assistant. Use the following context to answer the user's question:\n\n{context_text}\n\nIf the context doesn't contain relevant information, say so."
-        }
-        
-        messages = [system_message] + [{"role": msg.role, "content": msg.content} for msg in request.messages]
+        context_chunks, messages, usage = await prepare_chat(request)
+        sources = await cache_snapshot(cache_key, context_chunks)
         
         # Get completion from OpenAI
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        completion = client.chat.completions.create(
-            model=settings.MODEL_NAME,
-            messages=messages,
-            temperature=0.7,
-        )
+        async with openai_limiter:
+            completion = await get_openai_client().chat.completions.create(
+                model=settings.MODEL_NAME,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=settings.CHAT_MAX_RESPONSE_TOKENS,
+            )
+        
+        response = completion.choices[0].message.content
+        await cache_response(cache_key, sources, response, context_chunks)
         
         return ChatResponse(
-            response=completion.choices[0].message.content,
-            context=context_chunks
+            response=response,
+            context=context_chunks,
+            usage=usage
         )
     
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
-        raise HTTPException(status_code=500, detail=str(e))</content>
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event) + "\n"
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Stream a chat answer as NDJSON events.
+
+    Emits one ``context`` event with the retrieved chunks and planned token
+    usage, then ``token`` events as the completion arrives, and finally
+    ``done`` (or ``error``). A cached answer arrives as a single token event.
+    """
+    try:
+        cache_key = await response_cache_key(request)
+        cached = None
+        if cache_key is not None:
+            cached = await vector_store.response_cache.lookup(cache_key["embedding"], cache_key["scope"])
+        if cached is None:
+            context_chunks, messages, usage = await prepare_chat(request)
+            sources = await cache_snapshot(cache_key, context_chunks)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def cached_stream() -> AsyncIterator[str]:
+        yield _ndjson({"type": "context", "context": cached["context"], "usage": cached_usage(cached)})
+        yield _ndjson({"type": "token", "content": cached["response"]})
+        yield _ndjson({"type": "done"})
+
+    async def event_stream() -> AsyncIterator[str]:
+        # Send context first so the client can render sources immediately
+        yield _ndjson({"type": "context", "context": context_chunks, "usage": usage})
+        
+        stream = None
+        tokens = []
+        try:
+            async with openai_limiter:
+                stream = await get_openai_client().chat.completions.create(
+                    model=settings.MODEL_NAME,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=settings.CHAT_MAX_RESPONSE_TOKENS,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if await http_request.is_disconnected():
+                        logger.info("Client disconnected, cancelling completion stream")
+                        return
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        tokens.append(token)
+                        yield _ndjson({"type": "token", "content": token})
+            
+            await cache_response(cache_key, sources, "".join(tokens), context_chunks)
+            yield _ndjson({"type": "done"})
+        
+        except Exception as e:
+            logger.error(f"Error streaming chat completion: {e}")
+            yield _ndjson({"type": "error", "detail": str(e)})
+        
+        finally:
+            # Closing the stream aborts the upstream request if it is still running
+            if stream is not None:
+                await stream.close()
+
+    if cached is not None:
+        return StreamingResponse(cached_stream(), media_type="application/x-ndjson")
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
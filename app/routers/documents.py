@@ -1,41 +1,152 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from typing import List, Optional
+import os
 import uuid
+from datetime import datetime, timezone
+from ..core.document_catalog import confluence_scope, jira_scope
 from ..core.vector_store import vector_store
-from ..utils.document_parser import parse_document
+from ..core.jobs import job_manager
+from ..core.sync_state import sync_state
 from ..core.logger import logger
+from ..services.ingestion_jobs import UPLOAD_DIR, remove_upload
+from ..utils.file_spool import FileTooLargeError, spool_upload
 from pydantic import BaseModel
 
 router = APIRouter()
 
 class Document(BaseModel):
     id: str
-    filename: str
-    type: str
+    name: str
+    source: str
+    scope: Optional[str] = None
+    chunk_count: int
+    size: int
+    created_at: float
+    updated_at: float
 
-@router.post("/upload")
+class DocumentPage(BaseModel):
+    documents: List[Document]
+    next_cursor: Optional[str] = None
+
+class DeleteDocumentsRequest(BaseModel):
+    ids: List[str] = []
+    prefix: Optional[str] = None
+    jira_project: Optional[str] = None
+    confluence_space: Optional[str] = None
+
+def request_scope(jira_project: Optional[str], confluence_space: Optional[str]) -> Optional[str]:
+    if jira_project and confluence_space:
+        raise ValueError("Give either a Jira project or a Confluence space, not both")
+    if jira_project:
+        return jira_scope(jira_project)
+    if confluence_space:
+        return confluence_scope(confluence_space)
+    return None
+
+@router.get("/", response_model=DocumentPage)
+async def list_documents(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    source: Optional[str] = None,
+    jira_project: Optional[str] = None,
+    confluence_space: Optional[str] = None,
+    name: Optional[str] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None
+):
+    try:
+        # Served from the document catalog; chunk text is never read
+        return await vector_store.list_documents(
+            limit,
+            cursor,
+            source=source,
+            scope=request_scope(jira_project, confluence_space),
+            name=name,
+            updated_after=updated_after.timestamp() if updated_after else None,
+            updated_before=updated_before.timestamp() if updated_before else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing documents: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{doc_id}", response_model=Document)
+async def get_document(doc_id: str):
+    try:
+        document = await vector_store.get_document(doc_id)
+    except Exception as e:
+        logger.error(f"Error getting document: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+@router.post("/upload", status_code=202)
 async def upload_document(file: UploadFile = File(...)):
+    # Generate unique ID
+    doc_id = str(uuid.uuid4())
+    path = os.path.join(UPLOAD_DIR, doc_id)
     try:
-        # Generate unique ID
-        doc_id = str(uuid.uuid4())
-        
-        # Parse document content
-        content = await parse_document(file)
+        # Stream the upload to disk, which also lets the job resume after a restart
+        await spool_upload(file, path)
         
-        # Store in vector database
-        await vector_store.add_document(
-            doc_id=doc_id,
-            text=content,
-            metadata={
+        # Parse and store in vector database in a background job
+        job = job_manager.submit(
+            "document_upload",
+            {
+                "doc_id": doc_id,
+                "path": path,
                 "filename": file.filename,
-                "type": file.content_type
+                "content_type": file.content_type,
+                "uploaded_at": datetime.now(timezone.utc).isoformat()
             }
         )
         
-        return {"id": doc_id, "message": "Document uploaded successfully"}
+        return {"id": doc_id, "job_id": job["id"], "message": "Document upload queued"}
     
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Error uploading document: {e}")
+        if os.path.exists(path):
+            remove_upload(path)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/upload/batch", status_code=202)
+async def upload_documents_batch(files: List[UploadFile] = File(...)):
+    uploads = []
+    try:
+        for file in files:
+            doc_id = str(uuid.uuid4())
+            path = os.path.join(UPLOAD_DIR, doc_id)
+            await spool_upload(file, path)
+            uploads.append({
+                "doc_id": doc_id,
+                "path": path,
+                "filename": file.filename,
+                "content_type": file.content_type,
+                "uploaded_at": datetime.now(timezone.utc).isoformat()
+            })
+        
+        # Files are parsed in parallel and stored together in one job
+        job = job_manager.submit("document_batch_upload", {"files": uploads})
+        
+        return {
+            "ids": [upload["doc_id"] for upload in uploads],
+            "job_id": job["id"],
+            "message": f"{len(uploads)} documents queued"
+        }
+    
+    except FileTooLargeError as e:
+        # Drop the files already spooled for this batch
+        for upload in uploads:
+            remove_upload(upload["path"])
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error uploading documents: {e}")
+        for upload in uploads:
+            remove_upload(upload["path"])
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{doc_id}")
@@ -45,4 +156,25 @@ async def delete_document(doc_id: str):
         return {"message": "Document deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting document: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/delete")
+async def delete_documents(request: DeleteDocumentsRequest):
+    try:
+        # Every document matching any of the ids, the prefix or the project/space goes
+        stats = await vector_store.delete_documents(
+            request.ids,
+            prefix=request.prefix,
+            scope=request_scope(request.jira_project, request.confluence_space)
+        )
+        # Without its watermark, the next sync of a deleted project or space runs in full
+        if request.jira_project:
+            sync_state.clear("jira", request.jira_project)
+        if request.confluence_space:
+            sync_state.clear("confluence", request.confluence_space)
+        return stats
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error deleting documents: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
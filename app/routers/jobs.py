@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from ..core.jobs import job_manager
+from ..core.logger import logger
+from ..services import ingestion_jobs  # noqa: F401  (registers job handlers)
+
+router = APIRouter()
+
+@router.on_event("startup")
+async def start_job_workers():
+    # Re-queue jobs interrupted by a previous shutdown or crash
+    job_manager.start()
+
+@router.on_event("shutdown")
+async def stop_job_workers():
+    await job_manager.stop()
+
+@router.get("/")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    try:
+        return job_manager.store.list(status=status, limit=limit)
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
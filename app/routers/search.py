@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from pydantic import BaseModel
+from ..core.vector_store import vector_store
+from ..core.logger import logger
+from ..models import SearchFilters
+
+router = APIRouter()
+
+class SearchRequest(BaseModel):
+    query: str
+    n_results: int = 5
+    min_relevance_score: float = 0.7
+    filters: Optional[SearchFilters] = None
+    rerank: Optional[bool] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    n_results: int = 5
+    min_relevance_score: float = 0.7
+    filters: Optional[SearchFilters] = None
+
+@router.post("/")
+async def search(request: SearchRequest):
+    try:
+        return await vector_store.search(
+            request.query,
+            n_results=request.n_results,
+            min_relevance_score=request.min_relevance_score,
+            filters=request.filters,
+            rerank=request.rerank
+        )
+    except Exception as e:
+        logger.error(f"Error searching: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch")
+async def search_batch(request: BatchSearchRequest):
+    try:
+        # One embedding request and one multi-query Chroma call per batch of queries
+        results = await vector_store.search_batch(
+            request.queries,
+            n_results=request.n_results,
+            min_relevance_score=request.min_relevance_score,
+            filters=request.filters
+        )
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Error batch searching: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
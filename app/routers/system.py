@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+from ..core.clients import close_clients
+from ..core.execution import chroma_executor, execution_stats
+from ..core.vector_store import vector_store
+from ..core.logger import logger
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    try:
+        # Counting stored entries queries Chroma and SQLite, so keep it off the event loop
+        full_vectors = await chroma_executor.run(vector_store.full_vectors.stats) if vector_store.index_dimensions else None
+        response_cache = await chroma_executor.run(vector_store.response_cache.stats)
+        return {
+            "execution": execution_stats(),
+            "embedding": vector_store.embedder.stats(),
+            "embedding_cache": vector_store.embedding_cache.stats(),
+            "reranker": vector_store.reranker.stats(),
+            "full_vectors": full_vectors,
+            "response_cache": response_cache
+        }
+    except Exception as e:
+        logger.error(f"Error collecting metrics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.on_event("shutdown")
+async def shutdown_clients():
+    await close_clients()
@@ -1,12 +1,12 @@
 from typing import List
-import os
-from openai import OpenAI
 from ..models import ChatMessage
+from ..core.clients import get_openai_client
+from ..core.execution import openai_limiter
 from loguru import logger
 
 class ChatService:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_openai_client()
         
     async def process_chat(self, messages: List[ChatMessage]):
         try:
@@ -17,10 +17,11 @@ class ChatService:
             ]
             
             # Get response from OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=openai_messages
-            )
+            async with openai_limiter:
+                response = await self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=openai_messages
+                )
             
             return {"response": response.choices[0].message.content}
         except Exception as e:
@@ -0,0 +1,244 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import html2text
+from atlassian import Confluence
+from ..core.config import get_settings
+from ..core.document_catalog import confluence_scope
+from ..core.execution import io_executor
+from ..core.logger import logger
+from ..utils.document_parser import parse_confluence_attachments
+
+settings = get_settings()
+
+def html_to_markdown(html: str) -> str:
+    # HTML2Text keeps parser state, so use a fresh converter per call
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    return converter.handle(html)
+
+class ConfluenceCrawler:
+    """Crawls a Confluence space's page tree and indexes it as a pipeline.
+
+    Fetching, HTML-to-markdown conversion and embedding run as separate stages
+    joined by bounded queues, so page round trips overlap with conversion and
+    embedding. Fetching is limited to ``concurrency`` requests in flight; the
+    shared client's session retries rate-limited or failed requests.
+    """
+
+    def __init__(self, confluence: Confluence, vector_store, concurrency: int = None):
+        self.confluence = confluence
+        self.vector_store = vector_store
+        self.concurrency = concurrency or settings.CONFLUENCE_CONCURRENCY
+        self.page_limit = settings.CONFLUENCE_PAGE_LIMIT
+        self.queue_size = settings.CONFLUENCE_QUEUE_SIZE
+
+    async def _call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking Confluence call; the client's session retries 429 and 5xx responses."""
+        return await io_executor.run(fn, *args, **kwargs)
+
+    async def _list_root_pages(self, space_key: str) -> List[dict]:
+        pages = []
+        start = 0
+        while True:
+            response = await self._call(
+                self.confluence.get_space_content,
+                space_key,
+                depth="root",
+                start=start,
+                limit=self.page_limit,
+                content_type="page",
+                expand="body.storage,version"
+            )
+            results = response.get("results", [])
+            # Confluence may return fewer results than the limit (e.g. with
+            # bodies expanded) before the end, so only an empty page ends it
+            if not results:
+                return pages
+            pages.extend(results)
+            start += len(results)
+
+    async def _list_child_pages(self, page_id: str) -> List[dict]:
+        children = []
+        start = 0
+        while True:
+            results = await self._call(
+                self.confluence.get_page_child_by_type,
+                page_id,
+                type="page",
+                start=start,
+                limit=self.page_limit,
+                expand="body.storage,version"
+            )
+            if not results:
+                return children
+            children.extend(results)
+            start += len(results)
+
+    def _to_document(self, space_key: str, page: dict, parent: Optional[dict], markdown_content: str) -> Dict[str, Any]:
+        title = page["title"]
+        if parent is not None:
+            title = f"{page['title']} (Child page of {parent['title']})"
+
+        # Add page metadata to content
+        content = f"""
+            Title: {title}
+            Space: {space_key}
+            URL: {self.confluence.url}/wiki/spaces/{space_key}/pages/{page['id']}
+
+            Content:
+            {markdown_content}
+            """
+
+        metadata = {
+            "type": "confluence_page",
+            "title": page["title"],
+            "space_key": space_key,
+            "page_id": page["id"]
+        }
+        if parent is not None:
+            metadata["parent_page_id"] = parent["id"]
+        if page.get("version", {}).get("when"):
+            metadata["updated"] = datetime.fromisoformat(page["version"]["when"])
+
+        return {
+            "id": f"confluence_{page['id']}",
+            "text": content,
+            "metadata": metadata
+        }
+
+    async def crawl(
+        self,
+        space_key: str,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+        completed: Optional[set] = None
+    ) -> Dict[str, Any]:
+        """Crawl a space; pages in ``completed`` (from a checkpoint) are traversed but not re-indexed."""
+        started = time.perf_counter()
+        completed = set(completed or ())
+        # A page counts as done once its body is embedded and its attachments
+        # are processed; only those pages go into the checkpoint
+        indexed = set(completed)
+        attached = set(completed)
+        stats = {
+            "space": space_key,
+            "pages_fetched": 0,
+            "pages_embedded": 0,
+            "attachments": 0,
+            "chunks_embedded": 0,
+            "errors": 0,
+            "deleted": 0
+        }
+
+        frontier: asyncio.Queue = asyncio.Queue()
+        convert_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        seen = set()
+
+        def report():
+            if progress:
+                progress(dict(stats))
+
+        async def enqueue_page(page: dict, parent: Optional[dict]):
+            if page["id"] in seen:
+                return
+            seen.add(page["id"])
+            stats["pages_fetched"] += 1
+            if page["id"] not in completed:
+                await convert_queue.put((page, parent))
+            await frontier.put(page)
+
+        async def fetch_worker():
+            while True:
+                page = await frontier.get()
+                try:
+                    attachments = {}
+                    if page["id"] not in completed:
+                        attachments = await self._call(self.confluence.get_attachments_from_content, page["id"])
+                    if attachments.get("results"):
+                        stats["attachments"] += await parse_confluence_attachments(
+                            self.confluence,
+                            page["id"],
+                            attachments["results"],
+                            self.vector_store,
+                            space_key=space_key
+                        )
+                    attached.add(page["id"])
+                    for child in await self._list_child_pages(page["id"]):
+                        await enqueue_page(child, page)
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Error crawling Confluence page {page['id']}: {e}")
+                finally:
+                    frontier.task_done()
+
+        async def convert_worker():
+            while True:
+                item = await convert_queue.get()
+                if item is None:
+                    return
+                page, parent = item
+                try:
+                    markdown_content = await io_executor.run(html_to_markdown, page["body"]["storage"]["value"])
+                    await embed_queue.put(self._to_document(space_key, page, parent, markdown_content))
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Error converting Confluence page {page['id']}: {e}")
+
+        async def embed_worker():
+            done = False
+            while not done:
+                # Take whatever is queued, up to one embedding batch of documents
+                batch = [await embed_queue.get()]
+                while len(batch) < settings.EMBEDDING_BATCH_SIZE and not embed_queue.empty():
+                    batch.append(embed_queue.get_nowait())
+                if batch[-1] is None:
+                    done = True
+                    batch.pop()
+                if not batch:
+                    continue
+                try:
+                    result = await self.vector_store.add_documents_bulk(batch)
+                    stats["pages_embedded"] += len(batch)
+                    stats["chunks_embedded"] += result["embedded"]
+                    indexed.update(document["metadata"]["page_id"] for document in batch)
+                    if checkpoint:
+                        checkpoint({"completed": sorted(indexed & attached)})
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Error embedding Confluence pages: {e}")
+                report()
+
+        convert_workers = [asyncio.create_task(convert_worker()) for _ in range(2)]
+        embedder = asyncio.create_task(embed_worker())
+        fetchers = [asyncio.create_task(fetch_worker()) for _ in range(self.concurrency)]
+        try:
+            for page in await self._list_root_pages(space_key):
+                await enqueue_page(page, None)
+
+            # Wait for the whole tree to be traversed, then drain the pipeline
+            await frontier.join()
+            for _ in convert_workers:
+                await convert_queue.put(None)
+            await asyncio.gather(*convert_workers)
+            await embed_queue.put(None)
+            await embedder
+        finally:
+            for task in fetchers + convert_workers + [embedder]:
+                task.cancel()
+
+        # Drop pages that no longer exist, but only after a clean crawl
+        if stats["errors"] == 0:
+            stored_ids = await self.vector_store.get_document_ids(confluence_scope(space_key), "confluence_page")
+            removed = list(stored_ids - {f"confluence_{page_id}" for page_id in seen})
+            if removed:
+                await self.vector_store.delete_documents(removed)
+            stats["deleted"] += len(removed)
+
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        stats["pages_per_second"] = round(stats["pages_embedded"] / stats["elapsed_seconds"], 2) if stats["elapsed_seconds"] else 0.0
+        report()
+        logger.info(f"Finished crawling Confluence space {space_key}: {stats}")
+        return stats
@@ -1,5 +1,4 @@
-from atlassian import Confluence
-import os
+from ..core.clients import get_confluence
 from loguru import logger
 
 class ConfluenceService:
@@ -8,12 +7,8 @@ class ConfluenceService:
         
     async def connect_and_index(self, space_key: str):
         try:
-            # Initialize Confluence connection
-            self.confluence = Confluence(
-                url=os.getenv("CONFLUENCE_URL"),
-                username=os.getenv("CONFLUENCE_USERNAME"),
-                password=os.getenv("CONFLUENCE_API_TOKEN")
-            )
+            # Shared, pooled Confluence client
+            self.confluence = get_confluence()
             
             # Get all pages in the space
             pages = self.confluence.get_all_pages_from_space(space_key)
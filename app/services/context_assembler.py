@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Tuple
+from ..core.config import get_settings
+from ..utils.tokenizer import Tokenizer, get_tokenizer
+
+settings = get_settings()
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant. Use the following context to answer the user's question:"
+    "\n\n{context}\n\nIf the context doesn't contain relevant information, say so."
+)
+OMITTED_NOTE = "[{count} earlier messages omitted]"
+
+# Chat formatting adds a few tokens per message and for priming the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+class ContextAssembler:
+    """Builds a chat prompt that fits the model's context window.
+
+    The window, minus the tokens reserved for the answer, is split between the
+    system prompt, retrieved context and conversation history. The latest user
+    message is always kept; context chunks are packed by relevance up to the
+    context budget, and whatever is left goes to earlier turns, newest first.
+    Turns that do not fit are dropped and replaced by a short note.
+    """
+
+    def __init__(
+        self,
+        model: str = None,
+        context_window: int = None,
+        response_tokens: int = None,
+        context_tokens: int = None,
+        tokenizer: Tokenizer = None
+    ):
+        self.model = model or settings.MODEL_NAME
+        self.context_window = context_window or settings.CHAT_CONTEXT_WINDOW
+        self.response_tokens = response_tokens or settings.CHAT_MAX_RESPONSE_TOKENS
+        self.context_tokens = context_tokens or settings.CHAT_CONTEXT_TOKENS
+        self._tokenizer = tokenizer
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        # Loaded on first use so importing the chat router stays cheap
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer(self.model)
+        return self._tokenizer
+
+    def _message_tokens(self, message: Dict[str, str]) -> int:
+        return self.tokenizer.count(message["content"]) + TOKENS_PER_MESSAGE
+
+    def assemble(
+        self,
+        history: List[Dict[str, str]],
+        candidates: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], Dict[str, Any]]:
+        """Return the messages to send, the context chunks used and the planned token usage.
+
+        ``history`` is the conversation in OpenAI message format, ending with
+        the user's question; ``candidates`` are search results sorted by relevance.
+        """
+        budget = self.context_window - self.response_tokens - TOKENS_PER_REPLY
+        system_tokens = self.tokenizer.count(SYSTEM_PROMPT.format(context="")) + TOKENS_PER_MESSAGE
+
+        # The question itself always goes in, cut down if it alone is too long
+        question = dict(history[-1])
+        question_tokens = self._message_tokens(question)
+        question_budget = budget - system_tokens
+        if question_tokens > question_budget:
+            question["content"] = self.tokenizer.truncate(question["content"], question_budget - TOKENS_PER_MESSAGE)
+            question_tokens = self._message_tokens(question)
+        remaining = budget - system_tokens - question_tokens
+
+        # Pack context chunks by relevance; a chunk that does not fit is
+        # skipped so a smaller, less relevant one may still be used
+        context_budget = min(self.context_tokens, remaining)
+        separator_tokens = self.tokenizer.count("\n\n")
+        context_chunks = []
+        context_used = 0
+        for candidate in candidates:
+            tokens = self.tokenizer.count(candidate["content"]) + (separator_tokens if context_chunks else 0)
+            if context_used + tokens > context_budget:
+                continue
+            context_chunks.append(candidate)
+            context_used += tokens
+        remaining -= context_used
+
+        # Fill what is left with earlier turns, newest first
+        kept = []
+        omitted = 0
+        note_tokens = self.tokenizer.count(OMITTED_NOTE.format(count=len(history))) + TOKENS_PER_MESSAGE
+        for i, message in enumerate(reversed(history[:-1])):
+            tokens = self._message_tokens(message)
+            # Older turns must leave room for the omission note
+            if tokens + (note_tokens if i < len(history) - 2 else 0) > remaining:
+                omitted = len(history) - 1 - i
+                break
+            kept.insert(0, {"role": message["role"], "content": message["content"]})
+            remaining -= tokens
+
+        history_tokens = sum(self._message_tokens(message) for message in kept)
+        if omitted and note_tokens <= remaining:
+            kept.insert(0, {"role": "system", "content": OMITTED_NOTE.format(count=omitted)})
+            history_tokens += note_tokens
+
+        context_text = "\n\n".join(chunk["content"] for chunk in context_chunks)
+        messages = (
+            [{"role": "system", "content": SYSTEM_PROMPT.format(context=context_text)}]
+            + kept
+            + [question]
+        )
+
+        usage = {
+            "model": self.model,
+            "context_window": self.context_window,
+            "response_reserved": self.response_tokens,
+            "system_tokens": system_tokens,
+            "context_tokens": context_used,
+            "history_tokens": history_tokens,
+            "question_tokens": question_tokens,
+            "prompt_tokens": system_tokens + context_used + history_tokens + question_tokens + TOKENS_PER_REPLY,
+            "context_chunks": len(context_chunks),
+            "candidates": len(candidates),
+            "messages_omitted": omitted
+        }
+        return messages, context_chunks, usage
@@ -0,0 +1,129 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+from ..core.clients import get_confluence, get_jira
+from ..core.config import get_settings
+from ..core.execution import parser_pool
+from ..core.jobs import JobContext, job_manager
+from ..core.logger import logger
+from ..core.sync_state import sync_state
+from ..core.vector_store import vector_store
+from ..utils.document_parser import SPREADSHEET_TYPE, extract_text_file, iter_text_file
+from .confluence_crawler import ConfluenceCrawler
+from .jira_sync import JiraSync
+
+settings = get_settings()
+
+UPLOAD_DIR = os.path.join(settings.CHROMA_PERSIST_DIR, "uploads")
+
+async def run_jira_sync(ctx: JobContext) -> Dict[str, Any]:
+    return await JiraSync(get_jira(), vector_store, sync_state).sync(
+        ctx.params["project_key"],
+        full=ctx.params.get("full", False),
+        progress=ctx.update_progress,
+        checkpoint=ctx.save_checkpoint,
+        since=ctx.checkpoint.get("watermark")
+    )
+
+async def run_confluence_crawl(ctx: JobContext) -> Dict[str, Any]:
+    crawler = ConfluenceCrawler(get_confluence(), vector_store, concurrency=ctx.params.get("concurrency"))
+    return await crawler.crawl(
+        ctx.params["space_key"],
+        progress=ctx.update_progress,
+        checkpoint=ctx.save_checkpoint,
+        completed=set(ctx.checkpoint.get("completed", []))
+    )
+
+def text_path(params: Dict[str, Any]) -> str:
+    return params["path"] + ".txt"
+
+async def extract_upload(params: Dict[str, Any]) -> int:
+    # Parsed text goes to a spool file next to the upload instead of being
+    # pickled back from the worker process as one string
+    return await parser_pool.run(extract_text_file, params["path"], params["content_type"], text_path(params))
+
+def remove_upload(path: str):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not remove uploaded file {path}: {e}")
+
+def chunking_strategy(content_type: str) -> Optional[str]:
+    # Spreadsheets are parsed into one line per row
+    if content_type == SPREADSHEET_TYPE:
+        return "table"
+    return None
+
+def upload_document_entry(params: Dict[str, Any]) -> Dict[str, Any]:
+    # The extracted text is streamed from its spool file into the chunker
+    return {
+        "id": params["doc_id"],
+        "text": iter_text_file(text_path(params)),
+        "chunking": chunking_strategy(params["content_type"]),
+        "metadata": {
+            "filename": params["filename"],
+            "type": params["content_type"],
+            "updated": datetime.fromisoformat(params["uploaded_at"]) if params.get("uploaded_at") else None
+        }
+    }
+
+async def run_document_upload(ctx: JobContext) -> Dict[str, Any]:
+    params = ctx.params
+    try:
+        await extract_upload(params)
+        ctx.update_progress({"pages_fetched": 1})
+
+        stats = await vector_store.add_documents_bulk([upload_document_entry(params)])
+        ctx.update_progress({"chunks_embedded": stats["embedded"]})
+    except Exception:
+        # Failed jobs are not retried, so the upload is no longer needed; a
+        # job cancelled at shutdown keeps it to resume from
+        remove_upload(params["path"])
+        raise
+    finally:
+        if os.path.exists(text_path(params)):
+            remove_upload(text_path(params))
+
+    remove_upload(params["path"])
+    return {"id": params["doc_id"], **stats}
+
+async def run_document_batch_upload(ctx: JobContext) -> Dict[str, Any]:
+    files = ctx.params["files"]
+    parsed = 0
+    failed = []
+
+    async def parse(params: Dict[str, Any]):
+        nonlocal parsed
+        try:
+            await extract_upload(params)
+        except Exception as e:
+            logger.error(f"Error parsing uploaded file {params['filename']}: {e}")
+            failed.append({"id": params["doc_id"], "filename": params["filename"], "error": str(e)})
+            return None
+        parsed += 1
+        ctx.update_progress({"pages_fetched": parsed})
+        return upload_document_entry(params)
+
+    # Files are parsed in parallel across the parser pool's processes
+    try:
+        documents = [document for document in await asyncio.gather(*(parse(params) for params in files)) if document]
+        stats = await vector_store.add_documents_bulk(documents)
+        ctx.update_progress({"chunks_embedded": stats["embedded"]})
+    except Exception:
+        for params in files:
+            remove_upload(params["path"])
+        raise
+    finally:
+        for params in files:
+            if os.path.exists(text_path(params)):
+                remove_upload(text_path(params))
+
+    for params in files:
+        remove_upload(params["path"])
+    return {"ids": [document["id"] for document in documents], "failed": failed, **stats}
+
+job_manager.register("jira_sync", run_jira_sync)
+job_manager.register("confluence_crawl", run_confluence_crawl)
+job_manager.register("document_upload", run_document_upload)
+job_manager.register("document_batch_upload", run_document_batch_upload)
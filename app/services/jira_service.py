@@ -1,5 +1,4 @@
-from atlassian import Jira
-import os
+from ..core.clients import get_jira
 from loguru import logger
 
 class JiraService:
@@ -8,12 +7,8 @@ class JiraService:
         
     async def connect_and_index(self, project_key: str):
         try:
-            # Initialize Jira connection
-            self.jira = Jira(
-                url=os.getenv("JIRA_URL"),
-                username=os.getenv("JIRA_USERNAME"),
-                password=os.getenv("JIRA_API_TOKEN")
-            )
+            # Shared, pooled Jira client
+            self.jira = get_jira()
             
             # Get all issues for the project
             jql_query = f"project = {project_key}"
@@ -0,0 +1,190 @@
+import asyncio
+import math
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from atlassian import Jira
+from ..core.config import get_settings
+from ..core.document_catalog import jira_scope
+from ..core.execution import io_executor
+from ..core.logger import logger
+from ..core.sync_state import SyncStateStore
+
+settings = get_settings()
+
+ISSUE_FIELDS = ["summary", "description", "status", "issuetype", "parent", "subtasks", "updated"]
+
+def issue_to_document(issue: dict, project_key: str) -> Dict[str, Any]:
+    # Combine issue data
+    content = f"""
+            Issue Key: {issue['key']}
+            Type: {issue['fields']['issuetype']['name']}
+            Summary: {issue['fields']['summary']}
+            Description: {issue['fields'].get('description', 'No description')}
+            Status: {issue['fields']['status']['name']}
+            """
+
+    # Add parent information if it exists
+    if 'parent' in issue['fields']:
+        content += f"\nParent Issue: {issue['fields']['parent']['key']} - {issue['fields']['parent']['fields']['summary']}"
+
+    # Add subtasks if they exist
+    if issue['fields'].get('subtasks'):
+        content += "\nSubtasks:"
+        for subtask in issue['fields']['subtasks']:
+            content += f"\n- {subtask['key']}: {subtask['fields']['summary']}"
+
+    return {
+        "id": f"jira_{issue['key']}",
+        "text": content,
+        "metadata": {
+            "type": "jira_issue",
+            "key": issue["key"],
+            "project": project_key,
+            "updated": parse_jira_timestamp(issue["fields"]["updated"]) if issue["fields"].get("updated") else None
+        }
+    }
+
+def parse_jira_timestamp(value: str) -> datetime:
+    # Jira returns e.g. 2024-01-15T10:23:45.123+0000
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+class JiraSync:
+    """Pages through a Jira project and keeps the vector store in sync with it.
+
+    The first run indexes every issue. Later runs only fetch issues updated
+    since the stored high-water mark and drop issues that no longer exist.
+    """
+
+    def __init__(self, jira: Jira, vector_store, state: SyncStateStore, page_size: int = None):
+        self.jira = jira
+        self.vector_store = vector_store
+        self.state = state
+        self.page_size = page_size or settings.JIRA_PAGE_SIZE
+
+    def _build_jql(self, project_key: str, watermark: Optional[str]) -> str:
+        jql = f'project = "{project_key}"'
+        if watermark:
+            # Relative JQL dates avoid depending on the Jira user's timezone
+            since = datetime.now(timezone.utc) - parse_jira_timestamp(watermark)
+            minutes = math.ceil(since.total_seconds() / 60) + settings.JIRA_SYNC_OVERLAP_MINUTES
+            jql += f' AND updated >= "-{minutes}m"'
+        # Keys break ties, so issues sharing a timestamp keep their order across pages
+        return jql + " ORDER BY updated ASC, key ASC"
+
+    async def _fetch_page(self, jql: str, start: int, fields: List[str], limit: Optional[int] = None) -> dict:
+        return await io_executor.run(
+            self.jira.jql,
+            jql,
+            fields=fields,
+            start=start,
+            limit=limit or self.page_size
+        )
+
+    async def _list_issue_keys(self, project_key: str) -> Optional[set]:
+        """Keys of every issue in the project, or ``None`` if the project changed while they were listed.
+
+        Only keys are fetched, in large pages; once the first page gives the
+        total, the remaining pages are requested concurrently. Offsets shift
+        when issues are created or deleted meanwhile, which would leave live
+        keys out, so the listing only counts if every page reports the same
+        total and exactly that many distinct keys come back.
+        """
+        jql = f'project = "{project_key}" ORDER BY key ASC'
+        first = await self._fetch_page(jql, 0, ["key"], settings.JIRA_KEY_PAGE_SIZE)
+        total = first.get("total", 0)
+        # Jira may cap the page size below the one asked for
+        step = len(first.get("issues", []))
+        pages = [first]
+        if step:
+            pages += await asyncio.gather(*(
+                self._fetch_page(jql, start, ["key"], step)
+                for start in range(step, total, step)
+            ))
+        keys = {issue["key"] for page in pages for issue in page.get("issues", [])}
+        if len(keys) != total or any(page.get("total", 0) != total for page in pages):
+            return None
+        return keys
+
+    async def sync(
+        self,
+        project_key: str,
+        full: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+        since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Sync a project; ``since`` resumes an interrupted run from its checkpointed watermark."""
+        previous = None if full or since else self.state.get("jira", project_key)
+        watermark = since or (previous["watermark"] if previous else None)
+        jql = self._build_jql(project_key, watermark)
+        logger.info(f"Syncing Jira project {project_key} ({'incremental' if watermark else 'full'}): {jql}")
+
+        stats = {
+            "project": project_key,
+            "mode": "incremental" if watermark else "full",
+            "issues": 0,
+            "pages": 0,
+            "chunks_embedded": 0,
+            "deleted": 0
+        }
+        # Issues indexed this run, by key, with the updated value they had
+        processed: Dict[str, Optional[str]] = {}
+        start = 0
+        last_key = None
+        while True:
+            # Each later page starts one issue early; if that is not the last
+            # issue seen, issues before the offset were edited (moving them to
+            # the end) or deleted, and the offset would skip one. Re-query from
+            # the watermark instead, skipping issues already indexed.
+            page = await self._fetch_page(jql, start - 1 if start else 0, ISSUE_FIELDS)
+            issues = page.get("issues", [])
+            if start:
+                if not issues or issues[0]["key"] != last_key:
+                    logger.info(f"Jira project {project_key} changed during the sync; re-querying from {watermark}")
+                    jql = self._build_jql(project_key, watermark)
+                    start, last_key = 0, None
+                    continue
+                issues = issues[1:]
+            if not issues:
+                break
+
+            new_issues = [issue for issue in issues if processed.get(issue["key"]) != issue["fields"].get("updated")]
+            documents = [issue_to_document(issue, project_key) for issue in new_issues]
+            result = await self.vector_store.add_documents_bulk(documents)
+
+            for issue in new_issues:
+                updated = issue["fields"].get("updated")
+                processed[issue["key"]] = updated
+                if updated and (watermark is None or parse_jira_timestamp(updated) > parse_jira_timestamp(watermark)):
+                    watermark = updated
+
+            start += len(issues)
+            last_key = issues[-1]["key"]
+            stats["issues"] += len(new_issues)
+            stats["pages"] += 1
+            stats["chunks_embedded"] += result["embedded"]
+            stats["total"] = page.get("total", start)
+            if progress:
+                progress(dict(stats))
+            # Issues arrive in updated order, so everything up to the
+            # watermark is indexed and a restart can continue from it
+            if checkpoint:
+                checkpoint({"watermark": watermark})
+            if start >= page.get("total", 0):
+                break
+
+        if settings.JIRA_DETECT_DELETES:
+            live_keys = await self._list_issue_keys(project_key)
+            if live_keys is None:
+                # A partial listing would delete live issues; try again next run
+                logger.warning(f"Jira project {project_key} changed while listing its issues; skipping delete detection")
+            else:
+                stored_ids = await self.vector_store.get_document_ids(jira_scope(project_key), "jira_issue")
+                removed = list(stored_ids - {f"jira_{key}" for key in live_keys})
+                if removed:
+                    await self.vector_store.delete_documents(removed)
+                stats["deleted"] += len(removed)
+
+        self.state.set("jira", project_key, watermark, stats)
+        logger.info(f"Finished syncing Jira project {project_key}: {stats}")
+        return stats
@@ -1,94 +1,149 @@
-from fastapi import UploadFile
 import PyPDF2
 from docx import Document
 import openpyxl
 from io import BytesIO
+from typing import BinaryIO, Iterator, Optional, Union
+import asyncio
+import codecs
+from datetime import datetime
+import os
+from ..core.execution import io_executor, parser_pool
 from ..core.logger import logger
-from ..utils.text_chunker import TextChunker
+from .file_spool import download_to_file, new_spool_path
 
-async def parse_document(file: UploadFile) -> str:
-    content = ""
-    try:
-        file_content = await file.read()
-        file_type = file.content_type
-        
-        if file_type == "application/pdf":
-            content = parse_pdf(file_content)
-        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            content = parse_docx(file_content)
-        elif file_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
-            content = parse_xlsx(file_content)
-        else:
-            # For text files or unknown types, try to decode as text
-            content = file_content.decode()
-        
-        return content
-    except Exception as e:
-        logger.error(f"Error parsing document: {e}")
-        raise
+SPREADSHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_ROW_BLOCK = 200
+TEXT_BLOCK_SIZE = 64 * 1024
+
+def _as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+def iter_content(source: Union[bytes, BinaryIO], file_type: str) -> Iterator[str]:
+    """Yield a document's text in pieces (per page, paragraph or row block)."""
+    if file_type == "application/pdf":
+        return parse_pdf(source)
+    elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        return parse_docx(source)
+    elif file_type == SPREADSHEET_TYPE:
+        return parse_xlsx(source)
+    else:
+        # For text files or unknown types, try to decode as text
+        return parse_text(source)
+
+def extract_text_file(path: str, file_type: str, out_path: str) -> int:
+    """Parse ``path`` and write its text to ``out_path`` piece by piece.
+
+    Entry point for parser worker processes: neither side ever holds the
+    whole document text, and the caller streams ``out_path`` into the chunker.
+    """
+    written = 0
+    with open(path, "rb") as source, open(out_path, "w", encoding="utf-8") as out:
+        for piece in iter_content(source, file_type):
+            out.write(piece)
+            written += len(piece)
+    return written
+
+def iter_text_file(path: str, block_size: int = TEXT_BLOCK_SIZE) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            yield block
 
-def parse_pdf(content: bytes) -> str:
-    pdf_file = BytesIO(content)
-    pdf_reader = PyPDF2.PdfReader(pdf_file)
-    text = ""
+def parse_text(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    stream = _as_stream(source)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        block = stream.read(TEXT_BLOCK_SIZE)
+        if not block:
+            break
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+def parse_pdf(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    pdf_reader = PyPDF2.PdfReader(_as_stream(source))
     for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+        yield page.extract_text() + "\n"
+
+def parse_docx(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    doc = Document(_as_stream(source))
+    for i, paragraph in enumerate(doc.paragraphs):
+        yield ("\n" if i else "") + paragraph.text
+
+def parse_xlsx(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    # read_only streams rows from the archive instead of building the workbook in memory
+    wb = openpyxl.load_workbook(_as_stream(source), read_only=True)
+    try:
+        for sheet in wb.sheetnames:
+            ws = wb[sheet]
+            yield f"\nSheet: {sheet}\n"
+            rows = []
+            for row in ws.iter_rows(values_only=True):
+                rows.append(" | ".join([str(cell) if cell is not None else "" for cell in row]) + "\n")
+                if len(rows) >= XLSX_ROW_BLOCK:
+                    yield "".join(rows)
+                    rows = []
+            if rows:
+                yield "".join(rows)
+    finally:
+        wb.close()
 
-def parse_docx(content: bytes) -> str:
-    docx_file = BytesIO(content)
-    doc = Document(docx_file)
-    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+ATTACHMENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xlsx": SPREADSHEET_TYPE
+}
 
-def parse_xlsx(content: bytes) -> str:
-    xlsx_file = BytesIO(content)
-    wb = openpyxl.load_workbook(xlsx_file)
-    text = ""
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        text += f"\nSheet: {sheet}\n"
-        for row in ws.iter_rows(values_only=True):
-            text += " | ".join([str(cell) if cell is not None else "" for cell in row]) + "\n"
-    return text
+async def parse_confluence_attachments(confluence, page_id: str, attachments: list, vector_store, space_key: Optional[str] = None) -> int:
+    spooled = []
 
-async def parse_confluence_attachments(confluence, page_id: str, attachments: list, vector_store, chunker: TextChunker) -> int:
-    processed_count = 0
-    for attachment in attachments:
+    async def process(attachment: dict):
         try:
-            # Download attachment
-            content = confluence.get_attachment_by_id(attachment["id"])
-            
             # Parse based on file type
-            if attachment["title"].endswith(".pdf"):
-                text = parse_pdf(content)
-            elif attachment["title"].endswith(".docx"):
-                text = parse_docx(content)
-            elif attachment["title"].endswith(".xlsx"):
-                text = parse_xlsx(content)
-            else:
-                continue
-            
-            # Store in vector database with chunks
-            doc_id = f"confluence_attachment_{attachment['id']}"
-            chunks = chunker.get_chunks_with_overlap(text)
+            extension = os.path.splitext(attachment["title"])[1].lower()
+            file_type = ATTACHMENT_TYPES.get(extension)
+            if file_type is None:
+                return None
             
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{doc_id}_chunk_{i}"
-                await vector_store.add_document(
-                    doc_id=chunk_id,
-                    text=chunk["text"],
-                    metadata={
-                        "type": "confluence_attachment",
-                        "filename": attachment["title"],
-                        "page_id": page_id,
-                        "chunk_info": chunk["metadata"]
-                    }
-                )
+            # Stream the attachment to a spool file, then parse it in the
+            # parser process pool, which writes the text to a second spool file
+            path = new_spool_path(extension)
+            text_path = path + ".txt"
+            spooled.extend([path, text_path])
+            url = confluence.url + attachment["_links"]["download"]
+            await io_executor.run(download_to_file, confluence.session, url, path)
+            await parser_pool.run(extract_text_file, path, file_type, text_path)
             
-            processed_count += 1
+            return {
+                "id": f"confluence_attachment_{attachment['id']}",
+                "text": iter_text_file(text_path),
+                # Spreadsheets are parsed into one line per row
+                "chunking": "table" if file_type == SPREADSHEET_TYPE else None,
+                "metadata": {
+                    "type": "confluence_attachment",
+                    "filename": attachment["title"],
+                    "page_id": page_id,
+                    "space_key": space_key,
+                    "updated": datetime.fromisoformat(attachment["version"]["when"]) if attachment.get("version", {}).get("when") else None
+                }
+            }
         
         except Exception as e:
             logger.error(f"Error processing attachment {attachment['title']}: {e}")
-            continue
+            return None
+    
+    try:
+        # Attachments are downloaded and parsed in parallel
+        results = await asyncio.gather(*(process(attachment) for attachment in attachments))
+        documents = [document for document in results if document is not None]
+        
+        # Store all parsed attachments in one bulk call
+        if documents:
+            await vector_store.add_documents_bulk(documents)
+    finally:
+        for path in spooled:
+            if os.path.exists(path):
+                os.remove(path)
             
-    return processed_count
\ No newline at end of file
+    return len(documents)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from typing import Optional
+from fastapi import UploadFile
+import requests
+from ..core.config import get_settings
+from ..core.execution import io_executor
+
+settings = get_settings()
+
+class FileTooLargeError(ValueError):
+    pass
+
+def new_spool_path(suffix: str = "") -> str:
+    fd, path = tempfile.mkstemp(prefix="spool_", suffix=suffix)
+    os.close(fd)
+    return path
+
+def _remove_partial(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+async def spool_upload(file: UploadFile, path: str, max_bytes: Optional[int] = None) -> int:
+    """Copy an upload to ``path`` in fixed-size chunks, enforcing a size limit."""
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    out = await io_executor.run(open, path, "wb")
+    try:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise FileTooLargeError(f"{file.filename} exceeds the {max_bytes} byte upload limit")
+            await io_executor.run(out.write, chunk)
+    except BaseException:
+        out.close()
+        _remove_partial(path)
+        raise
+    await io_executor.run(out.close)
+    return size
+
+def download_to_file(session: requests.Session, url: str, path: str, max_bytes: Optional[int] = None) -> int:
+    """Stream a download to ``path`` without holding the body in memory (blocking)."""
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    size = 0
+    try:
+        # The timeout bounds connecting and each read, so a stalled download fails
+        with session.get(url, stream=True, timeout=settings.ATLASSIAN_TIMEOUT) as response:
+            response.raise_for_status()
+            with open(path, "wb") as out:
+                for chunk in response.iter_content(chunk_size=settings.UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FileTooLargeError(f"{url} exceeds the {max_bytes} byte download limit")
+                    out.write(chunk)
+    except BaseException:
+        _remove_partial(path)
+        raise
+    return size
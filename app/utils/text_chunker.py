@@ -1,42 +1,209 @@
-<content>from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 import re
+from ..core.config import get_settings
+from .tokenizer import Tokenizer, get_tokenizer
+
+settings = get_settings()
+
+INLINE_WHITESPACE = re.compile(r'[ \t\r\f\v]+')
+BLANK_LINES = re.compile(r'\n\s*\n\s*')
+WHITESPACE = re.compile(r'\s+')
+# How far past a position the text must be known before a boundary starting
+# there is complete (e.g. a markdown heading marker and its space)
+BOUNDARY_LOOKAHEAD = 64
+
+def normalize_inline(text: str) -> str:
+    return WHITESPACE.sub(' ', text).strip()
+
+def normalize_block(text: str) -> str:
+    # Keep line structure (headings, lists, table rows), drop runs of blanks
+    text = INLINE_WHITESPACE.sub(' ', text)
+    text = BLANK_LINES.sub('\n\n', text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+class BoundaryStrategy:
+    """Where text may be split, and how the resulting segments are joined.
+
+    Segments larger than the token budget are split again with ``fallback``,
+    and ultimately by token count.
+    """
+
+    def __init__(self, name: str, pattern: str, separator: str, normalize, fallback: Optional[str] = None):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.separator = separator
+        self.normalize = normalize
+        self.fallback = fallback
+
+    def split(self, text: str) -> List[str]:
+        segments = (self.normalize(segment) for segment in self.pattern.split(text))
+        return [segment for segment in segments if segment]
+
+STRATEGIES = {
+    "sentence": BoundaryStrategy("sentence", r'(?<=[.!?])\s+', " ", normalize_inline),
+    "paragraph": BoundaryStrategy("paragraph", r'\n[ \t]*\n\s*', "\n\n", normalize_block, fallback="sentence"),
+    "markdown": BoundaryStrategy("markdown", r'\n(?=#{1,6}[ \t])', "\n\n", normalize_block, fallback="paragraph"),
+    "table": BoundaryStrategy("table", r'\n+', "\n", normalize_inline, fallback="sentence"),
+}
+
+def register_strategy(strategy: BoundaryStrategy):
+    STRATEGIES[strategy.name] = strategy
+
+# A segment is (text, token count, separator placed before it)
+Segment = Tuple[str, int, str]
 
 class TextChunker:
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+    """Splits text into chunks of at most ``max_tokens`` tokens.
+
+    Text is cut at the boundaries of the chosen strategy (markdown headings,
+    paragraphs, sentences or table rows) and segments are packed greedily
+    into chunks, carrying up to ``overlap_tokens`` of trailing segments into
+    the next chunk. Input may arrive in pieces and is processed in one pass;
+    only the current chunk and the unsplit tail of the text are buffered.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = None,
+        overlap_tokens: int = None,
+        strategy: str = None,
+        tokenizer: Tokenizer = None
+    ):
+        self.max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+        self.overlap_tokens = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.strategy = STRATEGIES[strategy or settings.CHUNK_STRATEGY]
+        self.tokenizer = tokenizer or get_tokenizer(settings.EMBEDDING_MODEL)
+        # Bound the unsplit tail when the text has no boundaries for a while
+        self.max_segment_chars = self.max_tokens * 16
+        self._separator_tokens = {}
+
+    def _separator_cost(self, separator: str) -> int:
+        if separator not in self._separator_tokens:
+            self._separator_tokens[separator] = self.tokenizer.count(separator)
+        return self._separator_tokens[separator]
+
+    def _forced_cut(self, buffer: str, cut: int) -> int:
+        # Where text with no boundary for max_segment_chars is cut: the last
+        # space in reach, so the position depends only on the text
+        space = buffer.rfind(" ", cut + 1, cut + self.max_segment_chars)
+        return space if space != -1 else cut + self.max_segment_chars
+
+    def _iter_raw_segments(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Cut the incoming text at strategy boundaries, as if it had arrived in one piece.
+
+        The buffer holds only the text after the last cut, which is rescanned
+        with each new piece, since a boundary (e.g. ``\n## ``) may span pieces.
+        It stays short because text is cut by length past ``max_segment_chars``.
+        """
+        pattern = self.strategy.pattern
+        limit = self.max_segment_chars
+        buffer = ""
+        for piece in pieces:
+            buffer += piece
+            cut = 0
+            for match in pattern.finditer(buffer):
+                while match.start() - cut > limit:
+                    end = self._forced_cut(buffer, cut)
+                    yield buffer[cut:end]
+                    cut = end
+                if match.start() > cut:
+                    yield buffer[cut:match.start()]
+                cut = match.end()
+
+            # Cut by length only once a boundary starting in reach would be
+            # complete, so the cuts match those of the unsplit text
+            while len(buffer) - cut > limit + BOUNDARY_LOOKAHEAD:
+                end = self._forced_cut(buffer, cut)
+                yield buffer[cut:end]
+                cut = end
+            buffer = buffer[cut:]
+
+        cut = 0
+        while len(buffer) - cut > limit:
+            end = self._forced_cut(buffer, cut)
+            yield buffer[cut:end]
+            cut = end
+        if buffer[cut:]:
+            yield buffer[cut:]
+
+    def _split_oversized(self, text: str, strategy: BoundaryStrategy, separator: str) -> Iterator[Segment]:
+        """Yield ``text`` as segments within the budget; the first keeps ``separator``."""
+        tokens = self.tokenizer.count(text)
+        if tokens <= self.max_tokens:
+            yield text, tokens, separator
+            return
+
+        if strategy.fallback:
+            fallback = STRATEGIES[strategy.fallback]
+            parts = fallback.split(text)
+            if len(parts) > 1:
+                for i, part in enumerate(parts):
+                    yield from self._split_oversized(part, fallback, fallback.separator if i else separator)
+                return
+
+        # Last resort: fixed windows of tokens
+        encoded = self.tokenizer.encode(text)
+        step = max(1, self.max_tokens - self.overlap_tokens)
+        for start in range(0, len(encoded), step):
+            window = encoded[start:start + self.max_tokens]
+            yield self.tokenizer.decode(window), len(window), " " if start else separator
+            if start + self.max_tokens >= len(encoded):
+                return
+
+    def _iter_segments(self, pieces: Iterable[str]) -> Iterator[Segment]:
+        strategy = self.strategy
+        for raw in self._iter_raw_segments(pieces):
+            segment = strategy.normalize(raw)
+            if segment:
+                yield from self._split_oversized(segment, strategy, strategy.separator)
+
+    def _join(self, segments: List[Segment]) -> str:
+        parts = []
+        for i, (text, _, separator) in enumerate(segments):
+            if i:
+                parts.append(separator)
+            parts.append(text)
+        return "".join(parts)
+
+    def _finish(self, segments: List[Segment]) -> str:
+        chunk = self._join(segments)
+        # Segment counts plus separators bound the chunk's count in practice;
+        # re-check so the limit holds even if tokens merge across boundaries
+        return self.tokenizer.truncate(chunk, self.max_tokens)
+
+    def iter_chunks(self, pieces: Iterable[str]) -> Iterator[str]:
+        current: List[Segment] = []
+        current_tokens = 0
+
+        for segment in self._iter_segments(pieces):
+            _, tokens, separator = segment
+            cost = tokens + (self._separator_cost(separator) if current else 0)
+            if current and current_tokens + cost > self.max_tokens:
+                yield self._finish(current)
+
+                # Carry trailing segments into the next chunk as overlap
+                carried: List[Segment] = []
+                carried_tokens = 0
+                for previous in reversed(current):
+                    previous_cost = previous[1] + self._separator_cost(previous[2])
+                    if carried_tokens + previous_cost > self.overlap_tokens:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous_cost
+                if carried and carried_tokens + tokens + self._separator_cost(separator) > self.max_tokens:
+                    carried = []
+                current = carried
+                current_tokens = sum(s[1] for s in carried) + sum(self._separator_cost(s[2]) for s in carried[1:])
+                cost = tokens + (self._separator_cost(separator) if current else 0)
+
+            current.append(segment)
+            current_tokens += cost
+
+        if current:
+            yield self._finish(current)
 
     def split_text(self, text: str) -> List[str]:
-        # Clean text
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # If text is shorter than chunk size, return as single chunk
-        if len(text) <= self.chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            # Get chunk of text
-            end = start + self.chunk_size
-            
-            # If this is not the last chunk, try to break at a sentence
-            if end < len(text):
-                # Look for sentence boundaries within the last 100 characters of the chunk
-                last_period = text.rfind('.', start + self.chunk_size - 100, end)
-                if last_period != -1:
-                    end = last_period + 1
-            
-            # Add chunk to list
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            # Move start position, accounting for overlap
-            start = end - self.chunk_overlap
-        
-        return chunks
+        return list(self.iter_chunks([text]))
 
     def get_chunks_with_overlap(self, text: str) -> List[dict]:
         chunks = self.split_text(text)
@@ -49,4 +216,4 @@ class TextChunker:
                 }
             }
             for i, chunk in enumerate(chunks)
-        ]</content>
\ No newline at end of file
+        ]
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import List
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+
+class Tokenizer:
+    """Thin wrapper around a tiktoken encoding used for token budgeting."""
+
+    def __init__(self, encoding: tiktoken.Encoding):
+        self.encoding = encoding
+
+    def encode(self, text: str) -> List[int]:
+        return self.encoding.encode(text, disallowed_special=())
+
+    def decode(self, tokens: List[int]) -> str:
+        return self.encoding.decode(tokens)
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.decode(tokens[:max_tokens])
+
+@lru_cache()
+def get_tokenizer(model: str = None) -> Tokenizer:
+    # Loading an encoding builds its BPE ranks, so each one is created once
+    try:
+        encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+    except KeyError:
+        encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    return Tokenizer(encoding)
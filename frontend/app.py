@@ -4,6 +4,7 @@ import json
 from datetime import datetime
 
 API_URL = "http://localhost:8000"
+PAGE_SIZE = 20
 
 st.set_page_config(layout="wide")
 st.title("Document Management & Chat System")
@@ -20,27 +21,51 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Upload Document", type=['txt', 'pdf', 'doc', 'docx'])
     if uploaded_file:
         files = {"file": uploaded_file}
-        response = requests.post(f"{API_URL}/upload", files=files)
-        if response.status_code == 200:
-            st.success("Document uploaded successfully!")
+        response = requests.post(f"{API_URL}/documents/upload", files=files)
+        if response.status_code == 202:
+            st.success("Document uploaded and queued for indexing!")
         else:
             st.error("Error uploading document")
     
-    # List documents
+    # List documents, one catalog page at a time
     st.subheader("Existing Documents")
-    response = requests.get(f"{API_URL}/documents")
+    if 'doc_cursors' not in st.session_state:
+        st.session_state.doc_cursors = [None]
+    name_filter = st.text_input("Filter by name", key="doc_filter")
+    if st.session_state.get('doc_filter_applied') != name_filter:
+        # A new filter starts again from the first page
+        st.session_state.doc_filter_applied = name_filter
+        st.session_state.doc_cursors = [None]
+    
+    params = {"limit": PAGE_SIZE}
+    if st.session_state.doc_cursors[-1]:
+        params["cursor"] = st.session_state.doc_cursors[-1]
+    if name_filter:
+        params["name"] = name_filter
+    response = requests.get(f"{API_URL}/documents/", params=params)
     if response.status_code == 200:
-        documents = response.json()
-        for doc in documents:
+        page = response.json()
+        for doc in page['documents']:
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(doc['name'])
+                st.caption(f"{doc['source']} · {doc['chunk_count']} chunks")
             with col2:
                 if st.button("Delete", key=doc['id']):
                     del_response = requests.delete(f"{API_URL}/documents/{doc['id']}")
                     if del_response.status_code == 200:
                         st.success("Document deleted!")
                         st.rerun()
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if len(st.session_state.doc_cursors) > 1 and st.button("Previous"):
+                st.session_state.doc_cursors.pop()
+                st.rerun()
+        with col2:
+            if page['next_cursor'] and st.button("Next"):
+                st.session_state.doc_cursors.append(page['next_cursor'])
+                st.rerun()
 
 # Main chat interface
 st.header("Chat Interface")
@@ -55,20 +80,38 @@ if prompt := st.chat_input("Ask a question about your documents"):
     # Add user message to chat history
     st.session_state.chat_history.append({"role": "user", "content": prompt})
     
-    # Get response from API
-    response = requests.post(
-        f"{API_URL}/chat",
-        json={"message": prompt}
-    )
+    with st.chat_message("user"):
+        st.write(prompt)
     
-    if response.status_code == 200:
-        response_data = response.json()
-        # Add assistant response to chat history
-        st.session_state.chat_history.append({"role": "assistant", "content": response_data["response"]})
-        
-        # Show context if available
-        if response_data.get("context"):
-            with st.expander("Source Context"):
-                st.write(response_data["context"])
-    else:
-        st.error("Error getting response from the server")
\ No newline at end of file
+    # Stream response from API: context first, then tokens as they arrive
+    context = []
+    
+    def token_stream(response):
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "context":
+                context.extend(event["context"])
+            elif event["type"] == "token":
+                yield event["content"]
+            elif event["type"] == "error":
+                st.error(f"Error from the server: {event['detail']}")
+    
+    with requests.post(
+        f"{API_URL}/chat/stream",
+        json={"messages": st.session_state.chat_history},
+        stream=True
+    ) as response:
+        if response.status_code == 200:
+            with st.chat_message("assistant"):
+                answer = st.write_stream(token_stream(response))
+            # Add assistant response to chat history
+            st.session_state.chat_history.append({"role": "assistant", "content": answer})
+            
+            # Show context if available
+            if context:
+                with st.expander("Source Context"):
+                    st.write(context)
+        else:
+            st.error("Error getting response from the server")
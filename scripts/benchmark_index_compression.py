@@ -0,0 +1,119 @@
+"""Recall, memory and latency of compressed index settings.
+
+Compares exact search over full float32 vectors with the options for
+``INDEX_DIMENSIONS``: Matryoshka-truncated first passes with and without
+rescoring against full vectors, and int8 scalar-quantized first passes.
+Searches are brute force in NumPy, so latencies compare settings with each
+other rather than predict Chroma's HNSW timings; memory is the size of the
+vectors each first pass keeps in RAM.
+
+Run from the repository root:
+
+    python -m scripts.benchmark_index_compression --source store
+    python -m scripts.benchmark_index_compression --source synthetic --vectors 50000
+
+``--source store`` uses the embeddings in ``CHROMA_PERSIST_DIR`` and holds
+out a sample of them as queries. Synthetic vectors only roughly imitate a
+Matryoshka model's spectrum; use real embeddings for decisions.
+"""
+import argparse
+import time
+from typing import Callable, Tuple
+import numpy as np
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+def load_store_vectors() -> np.ndarray:
+    from app.core.vector_store import vector_store
+    if vector_store.index_dimensions:
+        vectors, _ = vector_store.full_vectors.get(vector_store.full_vectors.ids())
+        return vectors
+    collection = vector_store.collection
+    pages = []
+    for offset in range(0, collection.count(), 5000):
+        pages.append(np.asarray(collection.get(limit=5000, offset=offset, include=["embeddings"])["embeddings"], dtype=np.float32))
+    return np.concatenate(pages) if pages else np.zeros((0, 0), dtype=np.float32)
+
+def synthetic_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    # Variance decays along the dimensions, so leading ones carry most signal
+    rng = np.random.default_rng(seed)
+    scale = 1 / np.sqrt(1 + np.arange(dim) / 64)
+    return (rng.standard_normal((count, dim)) * scale).astype(np.float32)
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-dimension scalar quantization."""
+    scale = np.maximum(np.abs(matrix).max(axis=0), 1e-12) / 127
+    return np.round(matrix / scale).astype(np.int8), scale.astype(np.float32)
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+def timed(search: Callable[[np.ndarray], np.ndarray], queries: np.ndarray) -> Tuple[np.ndarray, float]:
+    results, times = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query[None, :])[0])
+        times.append(time.perf_counter() - started)
+    return np.array(results), float(np.median(times) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--source", choices=["store", "synthetic"], default="store")
+    parser.add_argument("--vectors", type=int, default=20000, help="synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=1536, help="synthetic vector length")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dimensions", default="256,384,512", help="truncation lengths to try")
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_store_vectors() if args.source == "store" else synthetic_vectors(args.vectors, args.dim, args.seed)
+    if len(corpus) <= args.queries:
+        raise SystemExit(f"Need more than {args.queries} vectors, found {len(corpus)}")
+    rng = np.random.default_rng(args.seed)
+    held_out = rng.choice(len(corpus), args.queries, replace=False)
+    queries = normalize(corpus[held_out])
+    corpus = normalize(np.delete(corpus, held_out, axis=0))
+    count, dim = corpus.shape
+    full_bytes = corpus.nbytes
+    full16 = corpus.astype(np.float16)
+    k, fetch = args.k, args.k * args.rescore_factor
+    print(f"{count} vectors x {dim} dims, {args.queries} held-out queries, recall@{k}, rescoring top {fetch}\n")
+
+    truth, exact_ms = timed(lambda q: top_k(q @ corpus.T, k), queries)
+
+    def rescore(query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        scores = full16[candidates].astype(np.float32) @ query[0]
+        return candidates[np.argsort(-scores)[:k]][None, :]
+
+    rows = [("float32, full", full_bytes, 0, 1.0, exact_ms)]
+    for d in [int(value) for value in args.dimensions.split(",") if int(value) < dim]:
+        truncated = normalize(corpus[:, :d])
+        found, ms = timed(lambda q: top_k(normalize(q[:, :d]) @ truncated.T, k), queries)
+        rows.append((f"float32, {d} dims", truncated.nbytes, 0, recall(found, truth), ms))
+        found, ms = timed(lambda q: rescore(q, top_k(normalize(q[:, :d]) @ truncated.T, fetch)[0]), queries)
+        rows.append((f"float32, {d} dims + rescore", truncated.nbytes, full16.nbytes, recall(found, truth), ms))
+
+        codes, scale = quantize_int8(truncated)
+        found, ms = timed(lambda q: rescore(q, top_k((normalize(q[:, :d]) * scale) @ codes.T.astype(np.float32), fetch)[0]), queries)
+        rows.append((f"int8, {d} dims + rescore", codes.nbytes + scale.nbytes, full16.nbytes, recall(found, truth), ms))
+
+    codes, scale = quantize_int8(corpus)
+    found, ms = timed(lambda q: rescore(q, top_k((q * scale) @ codes.T.astype(np.float32), fetch)[0]), queries)
+    rows.append(("int8, full + rescore", codes.nbytes + scale.nbytes, full16.nbytes, recall(found, truth), ms))
+
+    print(f"{'first pass':<30}{'RAM MB':>9}{'disk MB':>9}{'RAM x':>7}{'recall':>8}{'p50 ms':>9}")
+    for name, ram, disk, found_recall, ms in rows:
+        print(f"{name:<30}{ram / 2**20:>9.1f}{disk / 2**20:>9.1f}{full_bytes / ram:>7.1f}{found_recall:>8.3f}{ms:>9.2f}")
+    print("\nRAM is the first-pass vectors; disk is the float16 full vectors read for rescoring (memory-mapped).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import random
+import pytest
+import tiktoken
+from app.utils.text_chunker import STRATEGIES, TextChunker
+from app.utils.tokenizer import Tokenizer
+
+# A byte-level encoding, so the tests need no downloaded BPE ranks
+ENCODING = tiktoken.Encoding(
+    "bytes",
+    pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={}
+)
+TOKENIZER = Tokenizer(ENCODING)
+
+WORDS = ["alpha", "beta", "gamma", "delta", "ABC-1234", "status", "report", "x" * 40]
+
+def random_document(rng: random.Random, blocks: int = 60) -> str:
+    parts = []
+    for _ in range(blocks):
+        kind = rng.choice(["heading", "paragraph", "list", "table"])
+        if kind == "heading":
+            parts.append("#" * rng.randint(1, 6) + " " + " ".join(rng.choices(WORDS, k=3)))
+        elif kind == "paragraph":
+            sentences = [" ".join(rng.choices(WORDS, k=rng.randint(3, 25))) + rng.choice([".", "!", "?"]) for _ in range(rng.randint(1, 6))]
+            parts.append(rng.choice([" ", "  ", "\t"]).join(sentences))
+        elif kind == "list":
+            parts.append("\n".join("- " + " ".join(rng.choices(WORDS, k=4)) for _ in range(rng.randint(1, 5))))
+        else:
+            parts.append("\n".join(" | ".join(rng.choices(WORDS, k=3)) for _ in range(rng.randint(1, 8))))
+        parts.append(rng.choice(["\n", "\n\n", "\n \n", "\n\n\n"]))
+    return "".join(parts)
+
+def random_pieces(rng: random.Random, text: str, max_size: int):
+    pieces, start = [], 0
+    while start < len(text):
+        size = rng.randint(1, max_size)
+        pieces.append(text[start:start + size])
+        start += size
+    return pieces
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+@pytest.mark.parametrize("seed", range(5))
+def test_streamed_chunks_match_whole_text(strategy, seed):
+    rng = random.Random(seed)
+    text = random_document(rng)
+    chunker = TextChunker(max_tokens=120, overlap_tokens=20, strategy=strategy, tokenizer=TOKENIZER)
+    whole = chunker.split_text(text)
+    for max_size in (1, 3, 17, 200):
+        assert list(chunker.iter_chunks(random_pieces(rng, text, max_size))) == whole
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_boundaries_split_across_pieces(strategy):
+    text = "intro text. More text!\n\n## Heading two\nbody line\n\nlast | row\nend."
+    chunker = TextChunker(max_tokens=120, overlap_tokens=0, strategy=strategy, tokenizer=TOKENIZER)
+    whole = list(chunker._iter_segments([text]))
+    for i in range(1, len(text)):
+        assert list(chunker._iter_segments([text[:i], text[i:]])) == whole
+
+def test_chunks_stay_within_budget():
+    text = random_document(random.Random(0), blocks=200)
+    for strategy in STRATEGIES:
+        chunker = TextChunker(max_tokens=80, overlap_tokens=10, strategy=strategy, tokenizer=TOKENIZER)
+        assert all(TOKENIZER.count(chunk) <= 80 for chunk in chunker.split_text(text))